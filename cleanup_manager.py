@@ -4,141 +4,126 @@ Cleanup manager for removing files after upload and disk space management
 """
 import os
 import csv
+import errno
 import logging
 import shutil
-from datetime import datetime, timedelta
-from typing import List, Dict
-from config import format_size, DELETE_AFTER_UPLOAD
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, NamedTuple, Optional
+import config
+from config import DELETE_AFTER_UPLOAD
 
 logger = logging.getLogger('BackupBot.cleanup_manager')
 
+# Optional in config.py, configs written before the setting existed keep the default
+CLEANUP_UNLINK_PARALLELISM = getattr(config, 'CLEANUP_UNLINK_PARALLELISM', 8)
+
+# Columns of upload_history.csv, written by TelegramUploader
+UPLOAD_HISTORY_COLUMNS = (
+    'filename', 'source_path', 'upload_date', 'upload_success', 'file_size_mb', 'telegram_message_id'
+)
+
+# Column positions in upload_history.csv
+HISTORY_FILENAME_COL = UPLOAD_HISTORY_COLUMNS.index('filename')
+HISTORY_SOURCE_PATH_COL = UPLOAD_HISTORY_COLUMNS.index('source_path')
+HISTORY_UPLOAD_DATE_COL = UPLOAD_HISTORY_COLUMNS.index('upload_date')
+HISTORY_UPLOAD_SUCCESS_COL = UPLOAD_HISTORY_COLUMNS.index('upload_success')
+
+class UploadRecord(NamedTuple):
+    """Successful upload entry from the history file"""
+    filename: str
+    source_path: str
+    upload_date: str
+
 class CleanupManager:
     """Manages file cleanup after upload and disk space management"""
     
     def __init__(self, upload_history_file: str = 'upload_history.csv'):
         self.upload_history_file = upload_history_file
-        self.upload_history = []
+        # Successful uploads stored column-wise: one list per field
+        self._filenames = []
+        self._source_paths = []
+        self._upload_dates = []
         self.load_upload_history()
     
     def load_upload_history(self):
-        """Load upload history from CSV file"""
-        if not os.path.exists(self.upload_history_file):
-            logger.warning(f"Upload history file not found: {self.upload_history_file}")
-            return
+        """Load successful uploads from CSV file"""
+        filenames = []
+        source_paths = []
+        upload_dates = []
+        total_records = 0
         
         try:
-            with open(self.upload_history_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                self.upload_history = list(reader)
+            with open(self.upload_history_file, 'r', encoding='utf-8', newline='') as f:
+                for row in csv.reader(f):
+                    # Skip header and malformed lines
+                    if len(row) <= HISTORY_UPLOAD_SUCCESS_COL or row[HISTORY_FILENAME_COL] == 'filename':
+                        continue
+                    
+                    total_records += 1
+                    if row[HISTORY_UPLOAD_SUCCESS_COL].lower() == 'true':
+                        filenames.append(row[HISTORY_FILENAME_COL])
+                        source_paths.append(row[HISTORY_SOURCE_PATH_COL])
+                        upload_dates.append(row[HISTORY_UPLOAD_DATE_COL])
             
-            logger.info(f"Loaded {len(self.upload_history)} records from upload history")
+            self._filenames = filenames
+            self._source_paths = source_paths
+            self._upload_dates = upload_dates
+            logger.info(
+                f"Loaded {total_records} records from upload history, "
+                f"{len(filenames)} successful"
+            )
             
+        except FileNotFoundError:
+            logger.warning(f"Upload history file not found: {self.upload_history_file}")
         except Exception as e:
             logger.error(f"Error loading upload history: {e}")
-            self.upload_history = []
+            self._filenames = []
+            self._source_paths = []
+            self._upload_dates = []
     
     def delete_file_after_upload(self, file_info: Dict) -> bool:
         """Delete file after successful upload if configured"""
-        logger.info(f"🗑️ DELETE_AFTER_UPLOAD setting: {DELETE_AFTER_UPLOAD}")
+        file_path = file_info['path']
+        file_name = file_info['name']
         
         if not DELETE_AFTER_UPLOAD:
-            logger.info(f"🗑️ Auto-delete is disabled, skipping deletion for: {file_info['name']}")
+            logger.debug("🗑️ Auto-delete is disabled, skipping deletion for: %s", file_name)
             return False
         
+        logger.debug("🗑️ Starting deletion process for: %s", file_path)
+        
+        # Just try to delete and classify the failure instead of probing
+        # existence/permissions first - every probe is a round-trip on CIFS
         try:
-            file_path = file_info['path']
-            
-            logger.info(f"🗑️ Starting deletion process for: {file_path}")
-            
-            # Check if file exists
-            if not os.path.exists(file_path):
-                logger.warning(f"🗑️ File not found for deletion: {file_path}")
-                return False
-            
-            # Check if filesystem is read-only
-            try:
-                # Try to create a test file to check write permissions
-                test_path = os.path.join(os.path.dirname(file_path), '.write_test')
-                try:
-                    with open(test_path, 'w') as f:
-                        f.write('test')
-                    os.remove(test_path)
-                    logger.info(f"🗑️ Filesystem is writable: {os.path.dirname(file_path)}")
-                except (OSError, IOError) as e:
-                    if 'Read-only' in str(e) or 'EROFS' in str(e):
-                        logger.warning(f"🗑️ Filesystem is read-only, cannot delete files: {os.path.dirname(file_path)}")
-                        logger.warning(f"🗑️ File will be kept: {file_info['name']}")
-                        return False
-            except Exception as test_error:
-                logger.warning(f"🗑️ Could not test filesystem permissions: {test_error}")
-            
-            # Get file info before deletion
-            file_size = file_info['size_bytes']
-            file_size_display = format_size(file_size)
-            
-            logger.info(f"🗑️ File exists: {os.path.exists(file_path)}")
-            logger.info(f"🗑️ File size: {file_size_display}")
-            
-            # Get file permissions info
-            try:
-                file_stat = os.stat(file_path)
-                logger.info(f"🗑️ File permissions: {oct(file_stat.st_mode)}")
-                logger.info(f"🗑️ File owner UID: {file_stat.st_uid}")
-                logger.info(f"🗑️ Current process UID: {os.getuid()}")
-                
-                # Check if we have write permission to the directory
-                dir_path = os.path.dirname(file_path)
-                dir_stat = os.stat(dir_path)
-                can_write = os.access(dir_path, os.W_OK)
-                logger.info(f"🗑️ Directory write permission: {can_write}")
-                
-                if not can_write:
-                    logger.warning(f"🗑️ No write permission to directory: {dir_path}")
-                    logger.warning(f"🗑️ File will be kept: {file_info['name']}")
-                    return False
-                    
-            except Exception as e:
-                logger.warning(f"🗑️ Could not get file stats: {e}")
-            
-            # Delete the file
-            try:
-                os.remove(file_path)
-                logger.info("🗑️ os.remove() completed")
-            except OSError as e:
-                if e.errno == 30:  # Read-only file system
-                    logger.warning(f"🗑️ Read-only file system, cannot delete: {file_path}")
-                    logger.warning(f"🗑️ File will be kept: {file_info['name']}")
-                    return False
-                else:
-                    raise e
-            
-            # Verify deletion
-            if os.path.exists(file_path):
-                logger.error(f"❌ File still exists after deletion: {file_path}")
-                return False
-            else:
-                logger.info(f"🗑️ ✅ Successfully deleted: {file_info['name']} ({file_size_display})")
-                return True
-                
-        except PermissionError as e:
-            logger.error(f"❌ Permission denied deleting file {file_info['name']}: {e}")
-            return False
+            os.remove(file_path)
         except OSError as e:
-            if e.errno == 30:  # Read-only file system
-                logger.warning(f"🗑️ Read-only file system, cannot delete: {file_info['name']}")
+            if e.errno == errno.ENOENT:
+                logger.warning(f"🗑️ File already gone: {file_path}")
+                return True
+            elif e.errno == errno.EROFS:
+                logger.warning(f"🗑️ Read-only file system, cannot delete: {file_path}")
+                logger.warning(f"🗑️ File will be kept: {file_name}")
+                return False
+            elif e.errno in (errno.EACCES, errno.EPERM):
+                logger.error(f"❌ Permission denied deleting file {file_name}: {e}")
+                logger.warning(f"🗑️ File will be kept: {file_name}")
                 return False
             else:
-                logger.error(f"❌ OS error deleting file {file_info['name']}: {e}")
+                logger.error(f"❌ OS error deleting file {file_name}: {e}")
                 return False
         except Exception as e:
-            logger.error(f"❌ Error deleting file {file_info['name']}: {e}")
-            logger.error(f"❌ File path: {file_info['path']}")
+            logger.error(f"❌ Error deleting file {file_name}: {e}")
+            logger.error(f"❌ File path: {file_path}")
             return False
+        
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(f"🗑️ ✅ Successfully deleted: {file_name} ({file_info['size_display']})")
+        return True
     
-    def get_successful_uploads(self) -> List[Dict]:
+    def get_successful_uploads(self) -> List[UploadRecord]:
         """Get list of successfully uploaded files"""
-        return [record for record in self.upload_history 
-                if record.get('upload_success', '').lower() == 'true']
+        return list(map(UploadRecord, self._filenames, self._source_paths, self._upload_dates))
     
     def get_disk_usage(self, path: str = '/') -> Dict:
         """Get disk usage statistics for a path"""
@@ -201,35 +186,48 @@ class CleanupManager:
         
         logger.info(f"Need to free {space_to_free_gb:.1f}GB of disk space")
         
+        # Group candidates by directory so each directory is listed once
+        # (keyed by file name, which also drops repeated history entries)
+        records_by_dir = defaultdict(dict)
+        for record in successful_uploads:
+            file_dir, file_name = os.path.split(record.source_path)
+            records_by_dir[file_dir][file_name] = record
+        
         # Collect file information for cleanup candidates
         cleanup_candidates = []
         
-        for record in successful_uploads:
+        for file_dir, records in records_by_dir.items():
             try:
-                file_path = record['source_path']
-                
+                with os.scandir(file_dir or '.') as it:
+                    entries = {entry.name: entry for entry in it if entry.name in records}
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning(f"Error scanning directory {file_dir}: {e}")
+                continue
+            
+            for file_name, record in records.items():
                 # Skip if file doesn't exist
-                if not os.path.exists(file_path):
+                entry = entries.get(file_name)
+                if entry is None:
                     continue
                 
-                # Get file size and modification time
-                file_size = os.path.getsize(file_path)
-                mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+                try:
+                    file_stat = entry.stat()
+                except OSError as e:
+                    logger.warning(f"Error processing file {record.filename}: {e}")
+                    continue
                 
                 cleanup_candidates.append({
-                    'path': file_path,
-                    'size_gb': file_size / (1024**3),
-                    'modification_time': mod_time,
-                    'upload_date': record.get('upload_date', ''),
-                    'filename': record.get('filename', '')
+                    'path': record.source_path,
+                    'size_gb': file_stat.st_size / (1024**3),
+                    'mtime': file_stat.st_mtime,
+                    'upload_date': record.upload_date,
+                    'filename': record.filename
                 })
-                
-            except Exception as e:
-                logger.warning(f"Error processing file {record.get('filename', 'unknown')}: {e}")
-                continue
         
         # Sort by modification time (oldest first)
-        cleanup_candidates.sort(key=lambda x: x['modification_time'])
+        cleanup_candidates.sort(key=lambda x: x['mtime'])
         
         # Select files to delete until we reach target free space
         files_to_delete = []
@@ -249,6 +247,16 @@ class CleanupManager:
         
         return files_to_delete
     
+    def _remove_file(self, file_info: Dict) -> Optional[Exception]:
+        """Remove a single file, returning the error instead of raising it"""
+        # One unlink per file: missing files surface as FileNotFoundError,
+        # size comes from the candidate record instead of another stat
+        try:
+            os.remove(file_info['path'])
+            return None
+        except Exception as e:
+            return e
+    
     def cleanup_files(self, files: List[Dict]) -> Dict:
         """
         Delete specified files and return cleanup results
@@ -265,35 +273,35 @@ class CleanupManager:
         
         logger.info(f"Starting cleanup of {len(files)} files")
         
-        for file_info in files:
-            try:
-                file_path = file_info['path']
-                
-                # Double check file exists
-                if not os.path.exists(file_path):
-                    logger.warning(f"File not found, skipping: {file_path}")
-                    results['failed_deletions'] += 1
-                    continue
-                
-                # Get file size for logging
-                file_size = os.path.getsize(file_path)
-                file_size_gb = file_size / (1024**3)
-                
-                # Delete file
-                os.remove(file_path)
-                
-                # Verify deletion
-                if os.path.exists(file_path):
-                    logger.error(f"File still exists after deletion: {file_path}")
-                    results['failed_deletions'] += 1
+        # Keep files from the same directory together and bound the number
+        # of unlinks in flight; results are handled here in the calling thread
+        files = sorted(files, key=lambda f: os.path.dirname(f['path']))
+        
+        successful_deletions = 0
+        failed_deletions = 0
+        total_freed_gb = 0
+        log_deleted = logger.isEnabledFor(logging.INFO)
+        
+        with ThreadPoolExecutor(max_workers=CLEANUP_UNLINK_PARALLELISM) as executor:
+            errors = executor.map(self._remove_file, files)
+            
+            for file_info, error in zip(files, errors):
+                if error is None:
+                    file_size_gb = file_info.get('size_gb', 0)
+                    successful_deletions += 1
+                    total_freed_gb += file_size_gb
+                    if log_deleted:
+                        logger.info(f"✅ Deleted: {file_info['filename']} ({file_size_gb:.3f}GB)")
+                elif isinstance(error, FileNotFoundError):
+                    failed_deletions += 1
+                    logger.warning(f"File not found, skipping: {file_info['path']}")
                 else:
-                    logger.info(f"✅ Deleted: {file_info['filename']} ({file_size_gb:.3f}GB)")
-                    results['successful_deletions'] += 1
-                    results['total_freed_gb'] += file_size_gb
-                    
-            except Exception as e:
-                logger.error(f"❌ Failed to delete {file_info['filename']}: {e}")
-                results['failed_deletions'] += 1
+                    failed_deletions += 1
+                    logger.error(f"❌ Failed to delete {file_info['filename']}: {error}")
+        
+        results['successful_deletions'] = successful_deletions
+        results['failed_deletions'] = failed_deletions
+        results['total_freed_gb'] = total_freed_gb
         
         # Log cleanup results
         logger.info(
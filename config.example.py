@@ -39,6 +39,9 @@ PAUSE_BETWEEN_FILES = 3
 PAUSE_FOR_LARGE_FILES = 10
 PAUSE_VERY_LARGE_FILES = 25
 
+# Number of files uploaded at the same time (pauses apply per upload slot)
+UPLOAD_CONCURRENCY = 2
+
 # Size thresholds (in MB)
 LARGE_FILE_THRESHOLD = 100
 VERY_LARGE_FILE_THRESHOLD = 1000
@@ -54,6 +57,21 @@ RETRY_DELAY = 30
 # Delete files immediately after successful upload
 DELETE_AFTER_UPLOAD = True  # Установите False если не хотите удалять файлы
 
+# Maximum number of files deleted in parallel (after upload and during disk cleanup)
+# (keeps XFS/discard-enabled volumes from a deletion storm)
+CLEANUP_UNLINK_PARALLELISM = 8
+
+# =============================================================================
+# NETWORK SHARE SETTINGS
+# =============================================================================
+
+# CIFS caching of mounted shares:
+# True  - cache=strict, always sees files other hosts are still writing (safe default)
+# False - cache=loose,actimeo=60, fewer round trips to the server, but sizes and
+#         new files written by other hosts may show up to 60 seconds late.
+#         Only use it when the bot is the only writer on its shares
+SMB_STRICT_CACHE = True
+
 # =============================================================================
 # PATHS AND FILES
 # =============================================================================
@@ -82,6 +100,10 @@ PROGRESS_PERCENT_INTERVAL = 10  # percent
 TELEGRAM_PROGRESS_INTERVAL = 10  # files
 TELEGRAM_LARGE_FILE_THRESHOLD = 500  # MB
 
+# Text message sending limits (Telegram allows ~30 messages per second per bot)
+MESSAGE_SEND_CONCURRENCY = 3  # messages in flight at once
+MESSAGE_RATE_LIMIT = 30  # messages per second
+
 # =============================================================================
 # TELEthon OPTIMIZATION SETTINGS
 # =============================================================================
@@ -91,29 +113,28 @@ CONNECTION_RETRIES = 5
 TIMEOUT = 60
 REQUEST_RETRIES = 5
 
+# Flood waits up to this many seconds are slept through by Telethon itself
+# (Telethon default is 60)
+FLOOD_SLEEP_THRESHOLD = 120
+
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
+# Формат вывода для каждой единицы (B, KB, MB, GB, TB)
+_SIZE_FORMATS = ("{:d} B", "{:.1f} KB", "{:.1f} MB", "{:.2f} GB", "{:.2f} TB")
+
 def format_size(size_bytes: float) -> str:
     """Форматирует размер в байтах в человеко-читаемый вид"""
-    if size_bytes == 0:
+    size_bytes = int(size_bytes)
+    if size_bytes <= 0:
         return "0 B"
     
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    
+    # Индекс единицы по количеству бит: каждые 10 бит - следующая единица
+    i = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_FORMATS) - 1)
     if i == 0:  # Байты
-        return f"{int(size_bytes)} B"
-    elif i == 1:  # Килобайты
-        return f"{size_bytes:.1f} KB"
-    elif i == 2:  # Мегабайты  
-        return f"{size_bytes:.1f} MB"
-    else:  # Гигабайты и выше
-        return f"{size_bytes:.2f} {size_names[i]}"
+        return _SIZE_FORMATS[0].format(size_bytes)
+    return _SIZE_FORMATS[i].format(size_bytes / (1 << (10 * i)))
 
 # =============================================================================
 # LOGGING CONFIGURATION
@@ -165,12 +186,6 @@ def setup_logging():
     
     return logger
 
-# =============================================================================
-# UPLOAD HISTORY FILE TEMPLATE
-# =============================================================================
-
-UPLOAD_HISTORY_HEADER = "filename,source_path,upload_date,upload_success,file_size_mb,telegram_message_id,deleted_after_upload\n"
-
 # =============================================================================
 # SOURCES FILE TEMPLATE
 # =============================================================================
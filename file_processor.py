@@ -3,14 +3,23 @@
 File discovery and processing
 """
 import os
-import glob
+import re
+import fnmatch
 import logging
 from datetime import datetime
-from typing import List, Dict, Tuple
-from config import FILE_EXTENSIONS, MAX_FILE_SIZE, format_size
+from collections import defaultdict
+from typing import Callable, List, Dict, Tuple
+from config import FILE_EXTENSIONS, MAX_FILE_SIZE, LARGE_FILE_THRESHOLD, format_size
 
 logger = logging.getLogger('BackupBot.file_processor')
 
+# All FILE_EXTENSIONS patterns compiled into one matcher for file names
+_FILE_NAME_MATCH = re.compile('|'.join(fnmatch.translate(p) for p in FILE_EXTENSIONS)).match
+
+def format_timestamp(timestamp: float) -> str:
+    """Format UNIX time (st_mtime/st_ctime) for logs and messages"""
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+
 class FileProcessor:
     """Handles file discovery and information gathering"""
     
@@ -18,33 +27,30 @@ class FileProcessor:
         self.found_files = []
         self.sources_stats = {}
     
-    def get_file_info(self, file_path: str, source: str = "Unknown") -> Dict:
-        """Get detailed information about a file"""
+    def get_file_info(self, file_path: str, source: str = "Unknown", st: os.stat_result = None) -> Dict:
+        """
+        Get detailed information about a file
+        st: optional stat result already obtained by the caller (e.g. DirEntry.stat())
+        """
         try:
-            file_size = os.path.getsize(file_path)
+            if st is None:
+                st = os.stat(file_path)
+            
+            file_size = st.st_size
             file_size_mb = file_size / (1024 * 1024)
             file_size_gb = file_size / (1024 * 1024 * 1024)
             
-            # Get timestamps
-            try:
-                creation_time = datetime.fromtimestamp(os.path.getctime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-            except:
-                creation_time = "Unknown"
-            
-            try:
-                modification_time = datetime.fromtimestamp(os.path.getmtime(file_path)).strftime('%Y-%m-%d %H:%M:%S')
-            except:
-                modification_time = "Unknown"
-            
             return {
                 'name': os.path.basename(file_path),
                 'path': file_path,
+                'dir_path': os.path.dirname(file_path),
                 'source': source,
                 'size_bytes': file_size,
                 'size_mb': file_size_mb,
                 'size_gb': file_size_gb,
-                'creation_time': creation_time,
-                'modification_time': modification_time,
+                'size_display': format_size(file_size),
+                'ctime': st.st_ctime,  # raw timestamps, formatted only when shown
+                'mtime': st.st_mtime,
                 'is_too_large': file_size > MAX_FILE_SIZE
             }
             
@@ -52,6 +58,28 @@ class FileProcessor:
             logger.error(f"Error getting file info for {file_path}: {e}")
             return None
     
+    def _scan_directory(self, dir_path: str):
+        """Recursively yield directory entries of files matching FILE_EXTENSIONS"""
+        try:
+            with os.scandir(dir_path) as it:
+                entries = list(it)
+        except OSError as e:
+            logger.warning(f"Error reading directory {dir_path}: {e}")
+            return
+        
+        for entry in entries:
+            # Hidden files and directories are skipped, same as glob did
+            if entry.name.startswith('.'):
+                continue
+            
+            try:
+                if entry.is_dir():
+                    yield from self._scan_directory(entry.path)
+                elif entry.is_file() and _FILE_NAME_MATCH(entry.name):
+                    yield entry
+            except OSError as e:
+                logger.debug(f"Skipping {entry.path}: {e}")
+    
     def find_files_in_source(self, source_path: str, source_name: str = None) -> List[Dict]:
         """Find all matching files in a source directory"""
         if source_name is None:
@@ -61,32 +89,17 @@ class FileProcessor:
         found_files = []
         
         try:
-            for extension in FILE_EXTENSIONS:
-                # Build search pattern
-                if source_path.startswith('\\\\'):
-                    # Windows network path
-                    search_pattern = os.path.join(source_path, "**", extension)
-                else:
-                    # Linux path
-                    search_pattern = os.path.join(source_path, "**", extension)
-                
-                # Find files
+            # Single traversal of the tree instead of one glob per extension
+            for entry in self._scan_directory(source_path):
                 try:
-                    files = glob.glob(search_pattern, recursive=True)
-                    logger.debug(f"Found {len(files)} files with pattern {extension} in {source_path}")
-                    
-                    for file_path in files:
-                        if os.path.isfile(file_path):  # Only files, not directories
-                            file_info = self.get_file_info(file_path, source_name)
-                            if file_info:
-                                found_files.append(file_info)
-                                
-                except Exception as e:
-                    logger.warning(f"Error searching with pattern {extension} in {source_path}: {e}")
+                    st = entry.stat()
+                except OSError as e:
+                    logger.error(f"Error getting file info for {entry.path}: {e}")
                     continue
-            
-            # Sort by size (smallest first)
-            found_files.sort(key=lambda x: x['size_bytes'])
+                
+                file_info = self.get_file_info(entry.path, source_name, st)
+                if file_info:
+                    found_files.append(file_info)
             
             logger.info(f"Found {len(found_files)} total files in {source_path}")
             return found_files
@@ -129,8 +142,12 @@ class FileProcessor:
         logger.info(f"File discovery completed: {len(all_files)} files found across {len(sources)} sources")
         return all_files
     
-    def get_files_summary(self, files: List[Dict]) -> Dict:
-        """Generate summary statistics for files"""
+    def get_files_summary(self, files: List[Dict], dir_writable: Callable[[str], bool] = None) -> Dict:
+        """
+        Generate summary statistics for files
+        dir_writable: optional check of file directories, the ones failing it
+        are listed in 'read_only_dirs' of the summary
+        """
         if not files:
             return {
                 'total_files': 0,
@@ -138,23 +155,42 @@ class FileProcessor:
                 'total_size_gb': 0,
                 'sources_count': 0,
                 'large_files': 0,
-                'too_large_files': 0
+                'too_large_files': 0,
+                'read_only_dirs': []
             }
         
-        total_size_bytes = sum(f['size_bytes'] for f in files)
-        total_size_gb = total_size_bytes / (1024**3)
-        sources = set(f['source'] for f in files)
-        large_files = len([f for f in files if f['size_mb'] > 100])
-        too_large_files = len([f for f in files if f['is_too_large']])
+        # Single pass over the files
+        total_size_bytes = 0
+        sources = set()
+        large_files = 0
+        too_large_files = 0
+        checked_dirs = set()
+        read_only_dirs = []
+        
+        for f in files:
+            total_size_bytes += f['size_bytes']
+            sources.add(f['source'])
+            if f['size_mb'] > LARGE_FILE_THRESHOLD:
+                large_files += 1
+            if f['is_too_large']:
+                too_large_files += 1
+            
+            # Each directory is checked once
+            if dir_writable is not None and f['dir_path'] not in checked_dirs:
+                checked_dirs.add(f['dir_path'])
+                if not dir_writable(f['dir_path']):
+                    read_only_dirs.append(f['dir_path'])
+                    logger.warning(f"🗑️ Read-only directory detected: {f['dir_path']}")
         
         return {
             'total_files': len(files),
             'total_size_bytes': total_size_bytes,
-            'total_size_gb': total_size_gb,
+            'total_size_gb': total_size_bytes / (1024**3),
             'sources_count': len(sources),
             'large_files': large_files,
             'too_large_files': too_large_files,
-            'sources_stats': self.sources_stats
+            'sources_stats': self.sources_stats,
+            'read_only_dirs': read_only_dirs
         }
     
     def log_detailed_file_info(self, files: List[Dict]):
@@ -168,12 +204,9 @@ class FileProcessor:
         logger.info("=" * 80)
         
         # Group files by source
-        files_by_source = {}
+        files_by_source = defaultdict(list)
         for file_info in files:
-            source = file_info['source']
-            if source not in files_by_source:
-                files_by_source[source] = []
-            files_by_source[source].append(file_info)
+            files_by_source[file_info['source']].append(file_info)
         
         total_size_bytes = 0
         
@@ -189,8 +222,8 @@ class FileProcessor:
                 size_indicator = " ⚠️ TOO LARGE" if file_info['is_too_large'] else ""
                 
                 logger.info(f"  {i:3d}. {file_info['name']}")
-                logger.info(f"       Size: {format_size(file_info['size_bytes'])}{size_indicator}")
-                logger.info(f"       Modified: {file_info['modification_time']}")
+                logger.info(f"       Size: {file_info['size_display']}{size_indicator}")
+                logger.info(f"       Modified: {format_timestamp(file_info['mtime'])}")
             
             logger.info(f"  Source total: {len(source_files)} files, {format_size(source_size_bytes)}")
             logger.info("")
@@ -203,6 +236,6 @@ class FileProcessor:
             logger.info("")
             logger.info("⚠️  FILES TOO LARGE FOR UPLOAD:")
             for file_info in too_large_files:
-                logger.info(f"  - {file_info['name']} ({format_size(file_info['size_bytes'])})")
+                logger.info(f"  - {file_info['name']} ({file_info['size_display']})")
         
         logger.info("=" * 80)
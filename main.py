@@ -3,54 +3,228 @@
 Main script for Telegram Backup Bot
 """
 import os
+import re
 import sys
+import time
 import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add current directory to path for module imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import setup_logging, SOURCES_FILE, SOURCES_FILE_TEMPLATE, UPLOAD_HISTORY_FILE, format_size, DELETE_AFTER_UPLOAD
-from network_mount import NetworkMountManager
-from file_processor import FileProcessor
-from telegram_client import TelegramUploader
-from cleanup_manager import CleanupManager
+import config
+from config import (
+    setup_logging, SOURCES_FILE, SOURCES_FILE_TEMPLATE, UPLOAD_HISTORY_FILE,
+    format_size, DELETE_AFTER_UPLOAD
+)
+from file_processor import format_timestamp
 
 logger = logging.getLogger('BackupBot.main')
 
+# Optional in config.py, configs written before the settings existed keep the defaults
+SMB_STRICT_CACHE = getattr(config, 'SMB_STRICT_CACHE', True)
+MESSAGE_SEND_CONCURRENCY = getattr(config, 'MESSAGE_SEND_CONCURRENCY', 3)
+MESSAGE_RATE_LIMIT = getattr(config, 'MESSAGE_RATE_LIMIT', 30)
+CLEANUP_UNLINK_PARALLELISM = getattr(config, 'CLEANUP_UNLINK_PARALLELISM', 8)
+
+# Non-empty, non-comment line of sources.txt, without surrounding whitespace
+_SOURCE_LINE_RE = re.compile(r'^[^\S\n]*([^#\s][^\n]*?)[^\S\n]*$', re.M)
+
+# Host name does not change while the bot runs
+_NODE_NAME = os.uname().nodename
+
+# One entry of the detailed file list
+_FILE_ENTRY = (
+    "#{number}. {name}\n"
+    "   📏 Size: {size}\n"
+    "   📅 Modified: {modified}\n"
+    "   📍 Source: {source}\n"
+    "{flags}\n"
+)
+
+# Warning line of a file entry, indexed by (is_too_large, is_read_only)
+_TOO_LARGE_FLAG = "   ⚠️ TOO LARGE FOR TELEGRAM (max 2GB)\n"
+if DELETE_AFTER_UPLOAD:
+    _FILE_FLAGS = {
+        (False, False): "   🗑️ Will be deleted after upload\n",
+        (False, True): "   🗑️ READ-ONLY (will be kept)\n",
+        (True, False): _TOO_LARGE_FLAG,
+        (True, True): _TOO_LARGE_FLAG,
+    }
+else:
+    _FILE_FLAGS = {
+        (False, False): "",
+        (False, True): "",
+        (True, False): _TOO_LARGE_FLAG,
+        (True, True): _TOO_LARGE_FLAG,
+    }
+
+def _split_message(text: str, limit: int = 4096) -> list:
+    """
+    Split text into parts of at most `limit` characters
+    Parts are cut at blank lines where possible, longer paragraphs are cut hard
+    """
+    if len(text) <= limit:
+        return [text]
+    
+    parts = []
+    current = ""
+    for paragraph in text.split("\n\n"):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) <= limit:
+            current = candidate
+            continue
+        
+        if current:
+            parts.append(current)
+        while len(paragraph) > limit:
+            parts.append(paragraph[:limit])
+            paragraph = paragraph[limit:]
+        current = paragraph
+    
+    if current:
+        parts.append(current)
+    return parts
+
+class _TokenBucket:
+    """Async token bucket allowing at most `rate` acquisitions per `per` seconds"""
+    
+    def __init__(self, rate: int, per: float = 1.0):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self.tokens) * self.per / self.rate)
+
+class _MessageBatcher:
+    """
+    Collects message sections and sends them as few Telegram messages as possible
+    Messages of one batcher are sent one after another so they arrive in order,
+    separate batchers send concurrently
+    """
+    
+    # Telegram limit is 4096 characters per message, keep a safety margin
+    MAX_CHARS = 4000
+    SEPARATOR = "\n\n"
+    
+    def __init__(self, send):
+        self.send = send  # coroutine function sending one message text
+        self.sections = []
+        self.length = 0
+        self.pending = []
+    
+    async def _send_after(self, previous, message: str):
+        """Send message once the previous message of this batcher is sent"""
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        return await self.send(message)
+    
+    def add(self, text: str):
+        """Add section, dispatching the pending ones first if it would not fit"""
+        text = text.rstrip('\n')
+        if len(text) > self.MAX_CHARS:
+            for part in _split_message(text, self.MAX_CHARS):
+                self.add(part)
+            return
+        
+        added_length = len(text) + (len(self.SEPARATOR) if self.sections else 0)
+        
+        if self.sections and self.length + added_length > self.MAX_CHARS:
+            self._dispatch()
+            added_length = len(text)
+        
+        self.sections.append(text)
+        self.length += added_length
+    
+    def _dispatch(self):
+        """Queue pending sections as one message without waiting for it to be sent"""
+        if not self.sections:
+            return
+        
+        message = self.SEPARATOR.join(self.sections)
+        self.sections = []
+        self.length = 0
+        previous = self.pending[-1] if self.pending else None
+        self.pending.append(asyncio.create_task(self._send_after(previous, message)))
+    
+    async def flush(self):
+        """Send remaining sections and wait until all messages are sent"""
+        self._dispatch()
+        pending, self.pending = self.pending, []
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
 class BackupBot:
     """Main backup bot class coordinating all components"""
     
     def __init__(self):
+        # Components are imported here so early-exit paths in main() do not
+        # pay for loading Telethon and the other backends
+        from network_mount import NetworkMountManager
+        from file_processor import FileProcessor
+        from telegram_client import TelegramUploader
+        from cleanup_manager import CleanupManager
+        
         self.logger = logger
-        self.mount_manager = NetworkMountManager()
+        self.mount_manager = NetworkMountManager(strict_coherence=SMB_STRICT_CACHE)
         self.file_processor = FileProcessor()
         self.telegram_uploader = TelegramUploader()
         self.cleanup_manager = CleanupManager()
         self.sources = []
+        # Writability cache for the session: directories map to their device,
+        # the read-only flag is looked up once per device
+        self.dir_devices = {}  # directory -> st_dev (None if not accessible or not writable)
+        self.mount_ro_cache = {}  # st_dev -> mounted read-only
+        # Set when run() starts the session
+        self.session_start = None
+        self.session_start_str = ""
+        
+        # Shared limits for text messages sent concurrently
+        self.message_semaphore = asyncio.Semaphore(MESSAGE_SEND_CONCURRENCY)
+        self.message_rate_limiter = _TokenBucket(MESSAGE_RATE_LIMIT, 1.0)
+    
+    async def send_message_limited(self, text: str) -> bool:
+        """Send message respecting concurrency and rate limits"""
+        async with self.message_semaphore:
+            await self.message_rate_limiter.acquire()
+            return await self.telegram_uploader.send_message(text)
     
-    def load_and_prepare_sources(self) -> bool:
+    async def load_and_prepare_sources(self) -> bool:
         """Load sources from file and prepare network mounts"""
         try:
-            # Check if sources file exists
-            if not os.path.exists(SOURCES_FILE):
+            # Read sources file
+            try:
+                with open(SOURCES_FILE, 'r', encoding='utf-8') as f:
+                    lines = _SOURCE_LINE_RE.findall(f.read())
+            except FileNotFoundError:
                 self.logger.error(f"Sources file not found: {SOURCES_FILE}")
                 self.create_sample_sources_file()
                 return False
             
-            # Read sources file
-            with open(SOURCES_FILE, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-            
             if not lines:
                 self.logger.error(f"No valid sources found in {SOURCES_FILE}")
                 return False
             
             self.logger.info(f"Loaded {len(lines)} sources from {SOURCES_FILE}")
             
-            # Parse and prepare each source
-            prepared_sources = []
+            # Parse each source
+            valid_sources = []
             for line in lines:
                 path, username, password, mount_point = self.mount_manager.parse_source_line(line)
                 
@@ -58,8 +232,17 @@ class BackupBot:
                     self.logger.warning(f"Skipping invalid source line: {line}")
                     continue
                 
-                # Prepare source (mount if necessary)
-                accessible_path = self.mount_manager.prepare_source(line)
+                valid_sources.append((path, line))
+            
+            # Prepare sources (mount if necessary) - mounts are independent
+            # network operations, the mount manager runs them in parallel
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(
+                None, self.mount_manager.prepare_sources, [line for path, line in valid_sources]
+            )
+            
+            prepared_sources = []
+            for (path, line), accessible_path in zip(valid_sources, results):
                 if accessible_path:
                     source_name = f"{path}→{os.path.basename(accessible_path)}" if path != accessible_path else path
                     prepared_sources.append((source_name, accessible_path))
@@ -80,33 +263,47 @@ class BackupBot:
         self.logger.error(error_message)
         await self.telegram_uploader.send_error_notification(error_message)
     
-    def create_sample_sources_file(self):
+    @staticmethod
+    def create_sample_sources_file():
         """Create sample sources.txt file with template"""
         try:
             with open(SOURCES_FILE, 'w', encoding='utf-8') as f:
                 f.write(SOURCES_FILE_TEMPLATE)
-            self.logger.info(f"📝 Created sample {SOURCES_FILE}. Please edit it with your sources.")
+            logger.info(f"📝 Created sample {SOURCES_FILE}. Please edit it with your sources.")
         except Exception as e:
-            self.logger.error(f"Error creating sample sources file: {e}")
+            logger.error(f"Error creating sample sources file: {e}")
     
-    def check_read_only_filesystems(self, files: list) -> list:
-        """Check which filesystems are read-only and return list of read-only directories"""
-        read_only_dirs = set()
+    def is_dir_writable(self, file_dir: str) -> bool:
+        """
+        Check if directory is writable, querying each directory only once
+        Permissions are checked per directory, read-only state is taken from
+        the mount flags, checked once per device
+        """
+        try:
+            device = self.dir_devices[file_dir]
+        except KeyError:
+            try:
+                device = os.stat(file_dir).st_dev
+            except OSError:
+                device = None
+            # Read-write mount does not help if we may not write to the directory
+            if device is not None and not os.access(file_dir, os.W_OK):
+                device = None
+            self.dir_devices[file_dir] = device
+        
+        if device is None:
+            return False
         
-        for file_info in files:
-            file_dir = os.path.dirname(file_info['path'])
-            if file_dir not in read_only_dirs:
-                try:
-                    # Check if directory is writable
-                    if not os.access(file_dir, os.W_OK):
-                        read_only_dirs.add(file_dir)
-                        self.logger.warning(f"🗑️ Read-only directory detected: {file_dir}")
-                except Exception as e:
-                    self.logger.warning(f"🗑️ Could not check permissions for {file_dir}: {e}")
-        
-        return list(read_only_dirs)
+        read_only = self.mount_ro_cache.get(device)
+        if read_only is None:
+            try:
+                read_only = bool(os.statvfs(file_dir).f_flag & os.ST_RDONLY)
+            except OSError:
+                return False
+            self.mount_ro_cache[device] = read_only
+        return not read_only
     
-    async def send_startup_message(self, files_summary: dict, files: list):
+    async def send_startup_message(self, files_summary: dict, files: list, read_only_dirs: list):
         """Send startup message with file discovery summary and full file list"""
         # Format total size properly
         total_size_bytes = files_summary.get('total_size_bytes', 0)
@@ -115,8 +312,7 @@ class BackupBot:
         # Add info about auto-deletion
         deletion_info = "🗑️ AUTO-DELETE: ENABLED" if DELETE_AFTER_UPLOAD else "🗑️ AUTO-DELETE: DISABLED"
         
-        # Check for read-only filesystems
-        read_only_dirs = self.check_read_only_filesystems(files)
+        # Warn about read-only filesystems
         read_only_warning = ""
         if read_only_dirs and DELETE_AFTER_UPLOAD:
             read_only_warning = "\n⚠️ WARNING: Some sources are read-only (files will not be deleted)"
@@ -131,82 +327,89 @@ class BackupBot:
             f"📈 Large Files: {files_summary['large_files']}\n"
             f"⚠️ Too Large: {files_summary['too_large_files']}\n"
             f"{deletion_info}{read_only_warning}\n\n"
-            f"🖥️ Server: {os.uname().nodename}\n"
-            f"⏰ Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            f"🖥️ Server: {_NODE_NAME}\n"
+            f"⏰ Start Time: {self.session_start_str}"
         )
         
-        await self.telegram_uploader.send_message(message)
+        # Summary, sources overview and file list are packed into as few
+        # messages as the Telegram length limit allows
+        batcher = _MessageBatcher(self.send_message_limited)
+        batcher.add(message)
         
-        # Send sources overview
+        # Add sources overview
         if files_summary['sources_stats']:
-            sources_msg = "📡 SOURCES OVERVIEW:\n\n"
+            sources_parts = ["📡 SOURCES OVERVIEW:\n\n"]
             for source, stats in files_summary['sources_stats'].items():
                 source_size_display = format_size(stats['total_size_bytes'])
-                sources_msg += f"• {source}\n  📁 {stats['file_count']} files, {source_size_display}\n\n"
+                sources_parts.append(f"• {source}\n  📁 {stats['file_count']} files, {source_size_display}\n\n")
             
-            await self.telegram_uploader.send_message(sources_msg)
+            batcher.add("".join(sources_parts))
         
-        # Send detailed file list
-        await self.send_detailed_file_list(files)
+        # Add detailed file list
+        await self.send_detailed_file_list(files, batcher)
+        await batcher.flush()
     
-    async def send_detailed_file_list(self, files: list):
-        """Send detailed list of all files to be uploaded"""
+    async def send_detailed_file_list(self, files: list, batcher: '_MessageBatcher' = None):
+        """
+        Send detailed list of all files to be uploaded (in the given order)
+        batcher: queue the list into an existing batcher instead of sending it right away
+        """
+        own_batcher = batcher is None
+        if own_batcher:
+            batcher = _MessageBatcher(self.send_message_limited)
+        
         if not files:
-            await self.telegram_uploader.send_message("📋 No files found for upload")
+            batcher.add("📋 No files found for upload")
+            if own_batcher:
+                await batcher.flush()
             return
         
         self.logger.info(f"📤 Preparing to send detailed file list with {len(files)} files")
         
-        # Sort files by size (smallest first)
-        files_sorted = sorted(files, key=lambda x: x['size_bytes'])
-        
-        # Split files into chunks to avoid Telegram message length limits
-        chunk_size = 20  # Reduced chunk size for better formatting
-        file_chunks = [files_sorted[i:i + chunk_size] for i in range(0, len(files_sorted), chunk_size)]
+        # Split entries into parts by length to fit Telegram message limits
+        # (leave room for the part header and footer)
+        part_budget = _MessageBatcher.MAX_CHARS - 100
+        file_parts = []
+        current_part = []
+        current_length = 0
         
-        self.logger.info(f"📦 Split file list into {len(file_chunks)} chunks")
-        
-        for chunk_index, file_chunk in enumerate(file_chunks, 1):
-            file_list_msg = f"📋 FILES FOR UPLOAD"
-            if len(file_chunks) > 1:
-                file_list_msg += f" (Part {chunk_index}/{len(file_chunks)})"
-            file_list_msg += ":\n\n"
-            
-            for i, file_info in enumerate(file_chunk, 1):
-                file_size = format_size(file_info['size_bytes'])
-                file_number = (chunk_index - 1) * chunk_size + i
-                
-                # Add file entry
-                file_list_msg += f"#{file_number}. {file_info['name']}\n"
-                file_list_msg += f"   📏 Size: {file_size}\n"
-                file_list_msg += f"   📅 Modified: {file_info['modification_time']}\n"
-                file_list_msg += f"   📍 Source: {file_info['source']}\n"
-                
-                # Check if file is in read-only location
-                file_dir = os.path.dirname(file_info['path'])
-                is_read_only = not os.access(file_dir, os.W_OK)
-                
-                # Add warnings
-                if file_info['is_too_large']:
-                    file_list_msg += f"   ⚠️ TOO LARGE FOR TELEGRAM (max 2GB)\n"
-                elif DELETE_AFTER_UPLOAD:
-                    if is_read_only:
-                        file_list_msg += f"   🗑️ READ-ONLY (will be kept)\n"
-                    else:
-                        file_list_msg += f"   🗑️ Will be deleted after upload\n"
-                
-                file_list_msg += "\n"
+        for file_number, file_info in enumerate(files, 1):
+            # Check if file is in read-only location
+            is_read_only = not self.is_dir_writable(file_info['dir_path'])
             
-            # Add chunk info
-            if len(file_chunks) > 1:
-                file_list_msg += f"--- Part {chunk_index} of {len(file_chunks)} ---\n"
+            file_entry = _FILE_ENTRY.format_map({
+                'number': file_number,
+                'name': file_info['name'],
+                'size': file_info['size_display'],
+                'modified': format_timestamp(file_info['mtime']),
+                'source': file_info['source'],
+                'flags': _FILE_FLAGS[file_info['is_too_large'], is_read_only],
+            })
             
-            self.logger.info(f"📤 Sending file list chunk {chunk_index}/{len(file_chunks)}")
-            await self.telegram_uploader.send_message(file_list_msg)
+            if current_part and current_length + len(file_entry) > part_budget:
+                file_parts.append(current_part)
+                current_part = []
+                current_length = 0
+            current_part.append(file_entry)
+            current_length += len(file_entry)
+        
+        file_parts.append(current_part)
+        
+        self.logger.info(f"📦 Split file list into {len(file_parts)} chunks")
+        
+        for part_index, part_entries in enumerate(file_parts, 1):
+            if len(file_parts) > 1:
+                header = f"📋 FILES FOR UPLOAD (Part {part_index}/{len(file_parts)}):\n\n"
+                footer = f"--- Part {part_index} of {len(file_parts)} ---\n"
+            else:
+                header = "📋 FILES FOR UPLOAD:\n\n"
+                footer = ""
             
-            # Small delay between messages to avoid rate limiting
-            if chunk_index < len(file_chunks):
-                await asyncio.sleep(2)
+            self.logger.info(f"📤 Queueing file list chunk {part_index}/{len(file_parts)}")
+            batcher.add("".join([header, *part_entries, footer]))
+        
+        if own_batcher:
+            await batcher.flush()
     
     async def delete_files_after_upload(self, files: list) -> int:
         """Delete files after successful upload if configured"""
@@ -219,17 +422,32 @@ class BackupBot:
         read_only_filesystems = set()
         failed_deletions = 0
         
+        # Files on known read-only filesystems are kept without trying to delete them
+        deletable_files = []
         for file_info in files:
-            result = self.cleanup_manager.delete_file_after_upload(file_info)
+            file_dir = file_info['dir_path']
+            if self.is_dir_writable(file_dir):
+                deletable_files.append(file_info)
+            else:
+                read_only_filesystems.add(file_dir)
+                failed_deletions += 1
+                self.logger.warning(f"🗑️ Read-only filesystem, keeping: {file_info['name']}")
+        
+        # Deletions are independent blocking syscalls - run them in a thread
+        # pool and handle the results here in the original order
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=CLEANUP_UNLINK_PARALLELISM) as executor:
+            results = await asyncio.gather(*(
+                loop.run_in_executor(executor, self.cleanup_manager.delete_file_after_upload, file_info)
+                for file_info in deletable_files
+            ))
+        
+        for file_info, result in zip(deletable_files, results):
             if result is True:
                 deleted_count += 1
                 self.logger.info(f"🗑️ ✅ Deleted: {file_info['name']}")
             elif result is False:
                 failed_deletions += 1
-                # Check if it's a read-only filesystem
-                file_dir = os.path.dirname(file_info['path'])
-                if not os.access(file_dir, os.W_OK):
-                    read_only_filesystems.add(file_dir)
                 self.logger.warning(f"🗑️ ❌ Failed to delete: {file_info['name']}")
         
         self.logger.info(f"🗑️ Deletion completed: {deleted_count}/{len(files)} files deleted")
@@ -246,7 +464,7 @@ class BackupBot:
         
         # Send notification about read-only filesystems
         if read_only_filesystems:
-            await self.telegram_uploader.send_message(
+            message = (
                 f"⚠️ READ-ONLY FILESYSTEMS DETECTED\n\n"
                 f"Files could not be deleted from these locations:\n" +
                 "\n".join([f"• {path}" for path in sorted(read_only_filesystems)]) +
@@ -254,12 +472,15 @@ class BackupBot:
                 f"✅ Files deleted: {deleted_count}\n"
                 f"📊 Total processed: {len(files)}"
             )
+            for part in _split_message(message):
+                await self.telegram_uploader.send_message(part)
         
         return deleted_count
     
     async def send_completion_message(self, upload_results: dict):
         """Send completion message with upload statistics"""
         total_uploaded_display = format_size(upload_results['total_uploaded_bytes'])
+        completion_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # Add deletion statistics
         deletion_stats = ""
@@ -279,22 +500,23 @@ class BackupBot:
             f"❌ Failed: {upload_results['failed']}\n"
             f"{deletion_stats}"
             f"💾 Data Sent: {total_uploaded_display}\n"
-            f"⏰ Completion: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+            f"⏰ Completion: {completion_time}"
         )
         
         # Add failed files if any
         if upload_results['failed_uploads']:
-            failed_msg = "\n\n❌ Failed Files:\n"
+            failed_parts = ["\n\n❌ Failed Files:\n"]
             for i, failed in enumerate(upload_results['failed_uploads'][:10], 1):
                 failed_size = format_size(failed['size_bytes'])
-                failed_msg += f"{i}. {failed['name']} ({failed_size}) - {failed['source']}\n"
+                failed_parts.append(f"{i}. {failed['name']} ({failed_size}) - {failed['source']}\n")
             
             if len(upload_results['failed_uploads']) > 10:
-                failed_msg += f"... and {len(upload_results['failed_uploads']) - 10} more\n"
+                failed_parts.append(f"... and {len(upload_results['failed_uploads']) - 10} more\n")
             
-            message += failed_msg
+            message += "".join(failed_parts)
         
-        await self.telegram_uploader.send_message(message)
+        for part in _split_message(message):
+            await self.telegram_uploader.send_message(part)
         
         # Send error notification if there were failures
         if upload_results['failed'] > 0:
@@ -307,15 +529,17 @@ class BackupBot:
     
     async def run(self):
         """Main execution function"""
-        session_start = datetime.now()
+        # Session start is taken once and reused by the startup message
+        self.session_start = datetime.now()
+        self.session_start_str = self.session_start.strftime('%Y-%m-%d %H:%M:%S')
         self.logger.info("=" * 80)
-        self.logger.info(f"BACKUP BOT SESSION STARTED: {session_start.strftime('%Y-%m-%d %H:%M:%S')}")
+        self.logger.info(f"BACKUP BOT SESSION STARTED: {self.session_start_str}")
         self.logger.info("=" * 80)
         
         try:
             # Step 1: Load and prepare sources
             self.logger.info("📋 STEP 1: Loading sources...")
-            if not self.load_and_prepare_sources():
+            if not await self.load_and_prepare_sources():
                 error_msg = "❌ Failed to load sources. Exiting."
                 self.logger.error(error_msg)
                 # Initialize Telegram client just to send error notification
@@ -324,15 +548,22 @@ class BackupBot:
                     await self.telegram_uploader.disconnect()
                 return False
             
+            # Start file discovery in a worker thread so the directory scan
+            # overlaps with the Telegram connection handshake
+            loop = asyncio.get_running_loop()
+            discovery = loop.run_in_executor(None, self.file_processor.discover_files_from_sources, self.sources)
+            
             # Step 2: Initialize Telegram client
-            self.logger.info("📱 STEP 2: Initializing Telegram client...")
+            self.logger.info("📱 STEP 2: Initializing Telegram client (file discovery running in background)...")
             if not await self.telegram_uploader.initialize():
                 self.logger.error("❌ Failed to initialize Telegram client. Exiting.")
+                # Let the scan finish before sources are unmounted
+                await asyncio.gather(discovery, return_exceptions=True)
                 return False
             
             # Step 3: Discover files
-            self.logger.info("🔍 STEP 3: Discovering files...")
-            files = self.file_processor.discover_files_from_sources(self.sources)
+            self.logger.info("🔍 STEP 3: Waiting for file discovery to complete...")
+            files = await discovery
             
             if not files:
                 self.logger.warning("⚠️ No files found for upload")
@@ -340,13 +571,19 @@ class BackupBot:
                 await self.telegram_uploader.disconnect()
                 return True
             
-            # Generate and log file summary
-            files_summary = self.file_processor.get_files_summary(files)
+            # Sort once by size (smallest first): the same order is used for
+            # the log, the file list message, uploads and deletion
+            files.sort(key=lambda x: x['size_bytes'])
+            
+            # Generate file summary and check for read-only filesystems
+            # in one pass, once for all later steps
+            files_summary = self.file_processor.get_files_summary(files, self.is_dir_writable)
+            read_only_dirs = files_summary['read_only_dirs']
             self.file_processor.log_detailed_file_info(files)
             
             # Step 4: Send startup message with full file list
             self.logger.info("📤 STEP 4: Sending startup message with file list...")
-            await self.send_startup_message(files_summary, files)
+            await self.send_startup_message(files_summary, files, read_only_dirs)
             
             # Step 5: Upload files
             self.logger.info("⬆️ STEP 5: Starting file uploads...")
@@ -362,7 +599,7 @@ class BackupBot:
             await self.send_completion_message(upload_results)
             
             # Calculate session duration
-            session_duration = datetime.now() - session_start
+            session_duration = datetime.now() - self.session_start
             duration_str = str(session_duration).split('.')[0]  # Remove microseconds
             self.logger.info(f"✅ Session completed in {duration_str}")
             
@@ -401,6 +638,13 @@ async def main():
         print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 70)
         
+        # Without sources there is nothing to do - exit before creating
+        # the bot components and connecting to Telegram
+        if not os.access(SOURCES_FILE, os.F_OK):
+            logger.error(f"Sources file not found: {SOURCES_FILE}")
+            BackupBot.create_sample_sources_file()
+            sys.exit(1)
+        
         # Create and run bot
         bot = BackupBot()
         success = await bot.run()
@@ -418,5 +662,11 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    # Run the async main function
-    asyncio.run(main())
+    # Run the async main function, on uvloop event loop when it is installed
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(main())
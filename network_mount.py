@@ -3,20 +3,115 @@
 Network mount management for Windows shares
 """
 import os
+import re
+import json
+import ctypes
+import socket
 import subprocess
 import logging
-import tempfile
+import threading
 import time
+import weakref
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional
 
 logger = logging.getLogger('BackupBot.network_mount')
 
+MOUNTINFO_FILE = '/proc/self/mountinfo'
+MOUNTS_FILE = '/proc/mounts'
+
+# Reachability probe before mounting: SMB ports (direct, then NetBIOS),
+# connect timeout and how long a failed probe is remembered (seconds)
+SMB_PORTS = (445, 139)
+HOST_PROBE_TIMEOUT = 2.0
+HOST_PROBE_NEGATIVE_TTL = 10.0
+
+# Worker threads for parallel mounts and unmounts, shared by all batches;
+# threads are only started when a batch is submitted
+_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='mount')
+
+# SMB versions that worked per server, kept in the mount base between runs
+SMB_VERSION_CACHE_FILE = '.smb_versions.json'
+SMB_VERSIONS = ['3.0', '2.1', '2.0', '1.0']
+MOUNTINFO_CACHE_TTL = 1.0  # seconds
+
+# mount.cifs errors after which another SMB version may succeed:
+# EINVAL (unknown vers=default on kernels < 4.13), EOPNOTSUPP and
+# EHOSTDOWN (reported when the server only speaks an older dialect)
+SMB_PROTOCOL_ERRORS = ('mount error(22)', 'mount error(95)', 'mount error(112)')
+# Authentication failures, retrying with other versions will not help
+SMB_AUTH_ERRORS = ('mount error(13)',)
+
+# Mount point name from a Windows path: separators become '_', drive colons are dropped
+_MOUNT_NAME_TABLE = str.maketrans({'\\': '_', '/': '_', ':': ''})
+
+# umount2(2) flags
+MNT_FORCE = 1
+MNT_DETACH = 2
+
+# umount(8) arguments for the flags, used when libc cannot be loaded
+_UMOUNT_FLAG_ARGS = {0: [], MNT_DETACH: ['-l'], MNT_FORCE | MNT_DETACH: ['-f', '-l']}
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _libc.umount2.argtypes = (ctypes.c_char_p, ctypes.c_int)
+except (OSError, AttributeError):
+    _libc = None
+
+def _umount(mount_point: str, flags: int = 0) -> str:
+    """
+    Unmount with umount2(2) called directly, without forking umount(8)
+    Returns empty string on success, error description otherwise
+    """
+    if _libc is not None:
+        if _libc.umount2(os.fsencode(mount_point), flags) == 0:
+            return ""
+        return os.strerror(ctypes.get_errno())
+    
+    result = subprocess.run(['umount', *_UMOUNT_FLAG_ARGS[flags], mount_point], capture_output=True, text=True)
+    if result.returncode == 0:
+        return ""
+    return result.stderr.strip() or f"umount exited with code {result.returncode}"
+
+# Octal escapes used by the kernel for spaces etc. in mount paths
+_MOUNTINFO_ESCAPE_RE = re.compile(r'\\([0-7]{3})')
+
+def _unescape_mount_path(path: str) -> str:
+    """Decode octal escapes in a path from /proc/self/mountinfo"""
+    if '\\' not in path:
+        return path
+    return _MOUNTINFO_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 8)), path)
+
 class NetworkMountManager:
-    """Manages mounting and unmounting of network shares"""
+    """
+    Manages mounting and unmounting of network shares
+    Shares are mounted with strict cache coherence, pass strict_coherence=False
+    for loose attribute caching when the bot is the only writer on its shares
+    """
     
-    def __init__(self):
+    def __init__(self, strict_coherence: bool = True):
         self.active_mounts = {}
         self.mount_base = "/mnt/telegram_backup"
+        # Sources are mounted and unmounted from worker threads
+        self._lock = threading.Lock()
+        self._mountinfo_cache = (0.0, {})  # (monotonic read time, mount point -> line)
+        self._unreachable_hosts = {}  # host -> monotonic time of failed probe
+        
+        # Mount options except the SMB version, the same for every mount
+        self._uid = os.getuid()
+        self._gid = os.getgid()
+        cache_opts = 'cache=strict' if strict_coherence else 'cache=loose,actimeo=60'
+        self._base_opts = (
+            f'rw,{cache_opts},uid={self._uid},forceuid,gid={self._gid},forcegid,'
+            f'file_mode=0644,dir_mode=0755'
+        )
+        
+        self._version_cache_file = os.path.join(self.mount_base, SMB_VERSION_CACHE_FILE)
+        self._version_cache = self._load_version_cache()
+        
+        # Unmount leftovers when the manager is collected or at interpreter exit
+        self._finalizer = weakref.finalize(self, NetworkMountManager._cleanup_snapshot, self.active_mounts)
         
         # Create mount base directory
         os.makedirs(self.mount_base, exist_ok=True)
@@ -26,13 +121,10 @@ class NetworkMountManager:
         Parse source line: path|username|password|mount_point
         Returns: (path, username, password, mount_point)
         """
-        parts = line.split('|')
-        path = parts[0].strip() if len(parts) > 0 else ""
-        username = parts[1].strip() if len(parts) > 1 else ""
-        password = parts[2].strip() if len(parts) > 2 else ""
-        mount_point = parts[3].strip() if len(parts) > 3 else ""
+        # Missing trailing fields are empty
+        path, username, password, mount_point = (line.split('|', 4) + ['', '', ''])[:4]
         
-        return path, username, password, mount_point
+        return path.strip(), username.strip(), password.strip(), mount_point.strip()
     
     def is_windows_network_path(self, path: str) -> bool:
         """Check if path is a Windows network path"""
@@ -42,14 +134,18 @@ class NetworkMountManager:
         """Check if path is a local Linux path"""
         return path.startswith('/') and not path.startswith('//')
     
+    def default_mount_point(self, windows_path: str) -> str:
+        """Unique mount point under mount_base named after the Windows path"""
+        mount_name = windows_path.lstrip('\\').translate(_MOUNT_NAME_TABLE)
+        return os.path.join(self.mount_base, mount_name)
+    
     def mount_windows_share(self, windows_path: str, username: str = "", password: str = "", mount_point: str = "") -> Optional[str]:
         """Mount Windows network share"""
+        cred_file = None
         try:
             # Generate mount point if not provided
             if not mount_point:
-                # Create unique mount point name from windows path
-                mount_name = windows_path.replace('\\\\', '').replace('\\', '_').replace('/', '_').replace(':', '')
-                mount_point = os.path.join(self.mount_base, mount_name)
+                mount_point = self.default_mount_point(windows_path)
             
             # Create mount directory
             os.makedirs(mount_point, exist_ok=True)
@@ -72,6 +168,11 @@ class NetworkMountManager:
             if not smb_path.startswith('//'):
                 smb_path = '//' + smb_path.lstrip('/')
             
+            # Fail fast if the server cannot be reached, mount.cifs would
+            # block until its own resolver and connect timeouts expire
+            if not self._probe_host(smb_path):
+                return None
+            
             # Build credentials
             credentials = []
             if username:
@@ -84,37 +185,32 @@ class NetworkMountManager:
                 # Guest access
                 credentials.extend(['-o', 'guest'])
             
-            # Mount command - ИЗМЕНЕНО: ro -> rw для разрешения удаления файлов
-            mount_options = [
-                'rw',           # read-write вместо read-only
-                'vers=3.0',     # SMB version
-                'cache=strict', # кэширование
-                'uid=' + str(os.getuid()),  # текущий пользователь
-                'forceuid',     # принудительно использовать указанный uid
-                'gid=' + str(os.getgid()),  # текущая группа
-                'forcegid',     # принудительно использовать указанный gid
-                'file_mode=0644',
-                'dir_mode=0755'
-            ]
+            # Start with the version that worked for this server last time,
+            # otherwise let the kernel negotiate it
+            host = smb_path[2:].split('/', 1)[0].lower()
+            version = self._version_cache.get(host, 'default')
             
-            mount_cmd = ['mount', '-t', 'cifs', smb_path, mount_point] + credentials + ['-o', ','.join(mount_options)]
+            # Mount command - ИЗМЕНЕНО: ro -> rw для разрешения удаления файлов
+            mount_cmd = ['mount', '-t', 'cifs', smb_path, mount_point] + credentials + ['-o', f'vers={version},{self._base_opts}']
             
             logger.info(f"Mounting {windows_path} to {mount_point}")
             logger.info(f"Mount command: {' '.join(mount_cmd)}")
-            result = subprocess.run(mount_cmd, capture_output=True, text=True)
+            # mount(8) prints nothing useful to stdout, only errors are kept
+            result = subprocess.run(mount_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
             
             if result.returncode == 0:
                 logger.info(f"✅ Successfully mounted {windows_path} to {mount_point}")
-                self.active_mounts[mount_point] = {
-                    'windows_path': windows_path,
-                    'username': username,
-                    'has_password': bool(password),
-                    'mounted_by_script': True,
-                    'mount_time': time.time()
-                }
+                with self._lock:
+                    self.active_mounts[mount_point] = {
+                        'windows_path': windows_path,
+                        'username': username,
+                        'has_password': bool(password),
+                        'mounted_by_script': True,
+                        'mount_time': time.time()
+                    }
                 
                 # Проверяем права записи после монтирования
-                if self.test_write_permission(mount_point):
+                if self.test_write_permission(mount_point, strict=True):
                     logger.info(f"✅ Write permissions confirmed for {mount_point}")
                 else:
                     logger.warning(f"⚠️ Write permissions issue detected for {mount_point}")
@@ -122,47 +218,55 @@ class NetworkMountManager:
                 return mount_point
             else:
                 logger.error(f"❌ Failed to mount {windows_path}: {result.stderr}")
+                # Explicit SMB versions only help if the dialect negotiation failed
+                if any(error in result.stderr for error in SMB_AUTH_ERRORS):
+                    logger.error(f"❌ Authentication failed for {windows_path}, not retrying")
+                    return None
+                if not any(error in result.stderr for error in SMB_PROTOCOL_ERRORS):
+                    return None
+                
                 # Попробуем альтернативные варианты версий SMB
-                return self.try_alternative_mount_versions(smb_path, mount_point, credentials, windows_path)
+                return self.try_alternative_mount_versions(smb_path, mount_point, credentials, windows_path, version)
                 
         except Exception as e:
             logger.error(f"Error mounting {windows_path}: {e}")
             return None
+        
+        finally:
+            # Credentials are only read while mounting
+            if cred_file:
+                self.release_credentials_file(cred_file)
     
-    def try_alternative_mount_versions(self, smb_path: str, mount_point: str, credentials: list, windows_path: str) -> Optional[str]:
-        """Try alternative SMB versions if default fails"""
-        smb_versions = ['3.0', '2.1', '2.0', '1.0']
+    def try_alternative_mount_versions(self, smb_path: str, mount_point: str, credentials: list, windows_path: str,
+                                       tried_version: str = 'default') -> Optional[str]:
+        """Try other SMB versions if the first mount attempt failed to negotiate"""
+        smb_versions = [version for version in ['default'] + SMB_VERSIONS if version != tried_version]
         
         for version in smb_versions:
             try:
                 logger.info(f"Trying SMB version {version} for {windows_path}")
                 
-                mount_options = [
-                    'rw',
-                    f'vers={version}',
-                    'cache=strict',
-                    'uid=' + str(os.getuid()),
-                    'forceuid',
-                    'gid=' + str(os.getgid()),
-                    'forcegid',
-                    'file_mode=0644',
-                    'dir_mode=0755'
-                ]
-                
-                mount_cmd = ['mount', '-t', 'cifs', smb_path, mount_point] + credentials + ['-o', ','.join(mount_options)]
+                mount_cmd = ['mount', '-t', 'cifs', smb_path, mount_point] + credentials + ['-o', f'vers={version},{self._base_opts}']
                 
-                result = subprocess.run(mount_cmd, capture_output=True, text=True)
+                result = subprocess.run(mount_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
                 
                 if result.returncode == 0:
                     logger.info(f"✅ Successfully mounted {windows_path} with SMB {version}")
-                    self.active_mounts[mount_point] = {
-                        'windows_path': windows_path,
-                        'username': credentials[1].split('=')[1] if credentials else '',
-                        'has_password': len(credentials) > 2,
-                        'mounted_by_script': True,
-                        'mount_time': time.time()
-                    }
+                    with self._lock:
+                        self.active_mounts[mount_point] = {
+                            'windows_path': windows_path,
+                            'username': credentials[1].split('=')[1] if credentials else '',
+                            'has_password': len(credentials) > 2,
+                            'mounted_by_script': True,
+                            'mount_time': time.time()
+                        }
+                    self.remember_smb_version(smb_path[2:].split('/', 1)[0].lower(), version)
                     return mount_point
+                
+                # Authentication and network failures repeat with every version
+                if not any(error in result.stderr for error in SMB_PROTOCOL_ERRORS):
+                    logger.error(f"❌ SMB {version} mount failed for {windows_path}, not retrying: {result.stderr.strip()}")
+                    return None
                     
             except Exception as e:
                 logger.warning(f"Failed to mount with SMB {version}: {e}")
@@ -171,8 +275,73 @@ class NetworkMountManager:
         logger.error(f"❌ All SMB versions failed for {windows_path}")
         return None
     
-    def test_write_permission(self, mount_point: str) -> bool:
-        """Test if we have write permission to mounted share"""
+    def _probe_host(self, smb_path: str) -> bool:
+        """Check that the server of smb_path resolves and accepts SMB connections"""
+        host = smb_path[2:].split('/', 1)[0]
+        
+        failed_at = self._unreachable_hosts.get(host)
+        if failed_at is not None and time.monotonic() - failed_at < HOST_PROBE_NEGATIVE_TTL:
+            logger.error(f"❌ Host {host} was unreachable moments ago, skipping mount")
+            return False
+        
+        try:
+            socket.getaddrinfo(host, SMB_PORTS[0], type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            logger.error(f"❌ Cannot resolve host {host}: {e}")
+            self._unreachable_hosts[host] = time.monotonic()
+            return False
+        
+        for port in SMB_PORTS:
+            try:
+                with socket.create_connection((host, port), timeout=HOST_PROBE_TIMEOUT):
+                    self._unreachable_hosts.pop(host, None)
+                    return True
+            except OSError as e:
+                error = e
+        
+        logger.error(f"❌ Host {host} is not reachable on SMB ports: {error}")
+        self._unreachable_hosts[host] = time.monotonic()
+        return False
+    
+    def _load_version_cache(self) -> dict:
+        """Load SMB versions that worked per server in previous runs"""
+        try:
+            with open(self._version_cache_file, 'r', encoding='utf-8') as f:
+                version_cache = json.load(f)
+            if isinstance(version_cache, dict):
+                return version_cache
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load SMB version cache {self._version_cache_file}: {e}")
+        return {}
+    
+    def remember_smb_version(self, host: str, version: str):
+        """Save SMB version that worked for the server, to try it first next time"""
+        with self._lock:
+            if self._version_cache.get(host) == version:
+                return
+            self._version_cache[host] = version
+            
+            # Write a temporary file and replace the cache atomically
+            temp_file = f"{self._version_cache_file}.tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._version_cache, f, indent=2, sort_keys=True)
+                os.replace(temp_file, self._version_cache_file)
+            except OSError as e:
+                logger.warning(f"Could not save SMB version cache {self._version_cache_file}: {e}")
+    
+    def test_write_permission(self, mount_point: str, strict: bool = False) -> bool:
+        """
+        Test if we have write permission to mounted share or local path
+        strict: create and delete a test file instead of asking the kernel,
+        catches servers that refuse writes despite the local permissions
+        (used once right after mounting)
+        """
+        if not strict:
+            return os.access(mount_point, os.W_OK, effective_ids=True)
+        
         try:
             test_file = os.path.join(mount_point, '.write_test')
             with open(test_file, 'w') as f:
@@ -184,7 +353,10 @@ class NetworkMountManager:
             return False
     
     def create_credentials_file(self, username: str, password: str) -> str:
-        """Create temporary credentials file for CIFS mount"""
+        """
+        Create temporary credentials file for CIFS mount (mode 0600)
+        Remove it with release_credentials_file() once the mount command has finished
+        """
         try:
             fd, cred_file = tempfile.mkstemp(prefix='smb_cred_', text=True)
             with os.fdopen(fd, 'w') as f:
@@ -196,19 +368,51 @@ class NetworkMountManager:
             logger.error(f"Error creating credentials file: {e}")
             raise
     
-    def is_mounted(self, mount_point: str) -> bool:
-        """Check if directory is already mounted"""
+    def release_credentials_file(self, cred_file: str):
+        """Remove temporary credentials file"""
         try:
-            result = subprocess.run(['mountpoint', '-q', mount_point], capture_output=True)
-            return result.returncode == 0
-        except Exception:
-            # Fallback: check /proc/mounts
-            try:
-                with open('/proc/mounts', 'r') as f:
-                    mounts = f.read()
-                return mount_point in mounts
-            except:
-                return False
+            os.remove(cred_file)
+        except OSError as e:
+            logger.warning(f"Could not remove credentials file {cred_file}: {e}")
+    
+    def _mount_set(self) -> set:
+        """Read all current mount points from /proc/self/mountinfo"""
+        try:
+            with open(MOUNTINFO_FILE, 'r') as f:
+                # Field 4 of each line is the mount point
+                return {_unescape_mount_path(line.split(' ', 5)[4]) for line in f}
+        except FileNotFoundError:
+            # Fallback for systems without mountinfo: field 1 of /proc/mounts
+            with open(MOUNTS_FILE, 'r') as f:
+                return {_unescape_mount_path(line.split(' ', 2)[1]) for line in f}
+    
+    def _mountinfo_map(self) -> dict:
+        """
+        Map mount points to their /proc/self/mountinfo lines
+        The result is reused for MOUNTINFO_CACHE_TTL seconds
+        """
+        read_time, mountinfo = self._mountinfo_cache
+        now = time.monotonic()
+        if now - read_time < MOUNTINFO_CACHE_TTL:
+            return mountinfo
+        
+        with open(MOUNTINFO_FILE, 'r') as f:
+            mountinfo = {_unescape_mount_path(line.split(' ', 5)[4]): line.strip() for line in f}
+        self._mountinfo_cache = (now, mountinfo)
+        return mountinfo
+    
+    def is_mounted(self, mount_point: str, mount_set: Optional[set] = None) -> bool:
+        """
+        Check if directory is already mounted
+        mount_set: snapshot from _mount_set() to check several paths against
+        """
+        try:
+            if mount_set is None:
+                mount_set = self._mount_set()
+            return os.path.realpath(mount_point) in mount_set
+        except OSError:
+            # Fallback: compare devices of the path and its parent
+            return os.path.ismount(mount_point)
     
     def prepare_source(self, source_line: str) -> Optional[str]:
         """
@@ -226,7 +430,7 @@ class NetworkMountManager:
             if os.path.exists(path):
                 logger.info(f"✅ Local path accessible: {path}")
                 # Проверяем права записи для локальных путей
-                if os.access(path, os.W_OK):
+                if self.test_write_permission(path):
                     logger.info(f"✅ Write permissions confirmed for local path: {path}")
                 else:
                     logger.warning(f"⚠️ No write permissions for local path: {path}")
@@ -248,6 +452,40 @@ class NetworkMountManager:
             logger.error(f"❌ Unsupported path format: {path}")
             return None
     
+    def prepare_sources(self, source_lines: List[str]) -> List[Optional[str]]:
+        """
+        Prepare several sources in parallel
+        Returns accessible paths in the order of source_lines (None if failed)
+        """
+        if not source_lines:
+            return []
+        
+        # Sources sharing a mount point are prepared once, by the first of
+        # their lines: mounting them concurrently would stack mounts on one directory
+        futures = {}
+        keys = []
+        for line in source_lines:
+            path, _, _, mount_point = self.parse_source_line(line)
+            if self.is_windows_network_path(path):
+                key = os.path.normpath(mount_point or self.default_mount_point(path))
+            else:
+                key = path
+            keys.append(key)
+            if key not in futures:
+                futures[key] = _EXECUTOR.submit(self.prepare_source, line)
+            else:
+                logger.warning(f"Source {path} uses the same mount point as an earlier source: {key}")
+        
+        accessible_paths = []
+        for line, key in zip(source_lines, keys):
+            try:
+                accessible_paths.append(futures[key].result())
+            except Exception as e:
+                logger.error(f"Error preparing source {line}: {e}")
+                accessible_paths.append(None)
+        
+        return accessible_paths
+    
     def unmount_share(self, mount_point: str) -> bool:
         """Unmount network share"""
         try:
@@ -258,12 +496,12 @@ class NetworkMountManager:
             logger.info(f"Unmounting {mount_point}")
             
             # Try gentle unmount first
-            result = subprocess.run(['umount', mount_point], capture_output=True, text=True)
+            error = _umount(mount_point)
             
-            if result.returncode == 0:
+            if not error:
                 logger.info(f"✅ Successfully unmounted {mount_point}")
                 # Remove from active mounts
-                if mount_point in self.active_mounts:
+                with self._lock:
                     self.active_mounts.pop(mount_point, None)
                 
                 # Try to remove mount directory if empty
@@ -275,16 +513,16 @@ class NetworkMountManager:
                     
                 return True
             else:
-                logger.warning(f"Gentle unmount failed, trying lazy unmount: {result.stderr}")
+                logger.warning(f"Gentle unmount failed, trying lazy unmount: {error}")
                 # Try lazy unmount
-                result = subprocess.run(['umount', '-l', mount_point], capture_output=True, text=True)
-                if result.returncode == 0:
+                error = _umount(mount_point, MNT_DETACH)
+                if not error:
                     logger.info(f"✅ Successfully lazy-unmounted {mount_point}")
-                    if mount_point in self.active_mounts:
+                    with self._lock:
                         self.active_mounts.pop(mount_point, None)
                     return True
                 else:
-                    logger.error(f"❌ Failed to unmount {mount_point}: {result.stderr}")
+                    logger.error(f"❌ Failed to unmount {mount_point}: {error}")
                     return False
                 
         except Exception as e:
@@ -295,22 +533,43 @@ class NetworkMountManager:
         """Unmount all active mounts and cleanup"""
         logger.info(f"Starting mount cleanup...")
         
-        # First cleanup our own mounts
-        if self.active_mounts:
-            logger.info(f"Cleaning up {len(self.active_mounts)} script-managed mounts...")
+        # First cleanup our own mounts (in parallel, shares are independent)
+        with self._lock:
+            managed_mounts = list(self.active_mounts.keys())
+        
+        if managed_mounts:
+            logger.info(f"Cleaning up {len(managed_mounts)} script-managed mounts...")
             
-            for mount_point in list(self.active_mounts.keys()):
+            for mount_point in managed_mounts:
                 logger.info(f"Unmounting script-managed mount: {mount_point}")
-                self.unmount_share(mount_point)
+            
+            if len(managed_mounts) == 1:
+                self.unmount_share(managed_mounts[0])
+            else:
+                list(_EXECUTOR.map(self.unmount_share, managed_mounts))
         
-        # Also check and cleanup any mounts in our mount base directory
+        # Also check and cleanup any mounts in our mount base directory.
+        # The kernel mount table is the record of mounts left behind by a
+        # crashed run, so no state file or per-directory checks are needed
         try:
-            if os.path.exists(self.mount_base):
-                for item in os.listdir(self.mount_base):
-                    mount_point = os.path.join(self.mount_base, item)
-                    if os.path.isdir(mount_point) and self.is_mounted(mount_point):
-                        logger.info(f"Found orphaned mount at {mount_point}, unmounting...")
-                        self.unmount_share(mount_point)
+            try:
+                mount_base = os.path.realpath(self.mount_base)
+                orphaned_mounts = sorted(
+                    mount_point for mount_point in self._mount_set()
+                    if os.path.dirname(mount_point) == mount_base
+                )
+            except OSError:
+                # Fallback: check every directory in the mount base
+                orphaned_mounts = []
+                if os.path.exists(self.mount_base):
+                    with os.scandir(self.mount_base) as entries:
+                        for entry in entries:
+                            if entry.is_dir(follow_symlinks=False) and self.is_mounted(entry.path):
+                                orphaned_mounts.append(entry.path)
+            
+            for mount_point in orphaned_mounts:
+                logger.info(f"Found orphaned mount at {mount_point}, unmounting...")
+                self.unmount_share(mount_point)
         except Exception as e:
             logger.error(f"Error cleaning up orphaned mounts: {e}")
         
@@ -319,21 +578,15 @@ class NetworkMountManager:
     def get_mount_info(self, mount_point: str) -> dict:
         """Get information about mounted share"""
         try:
-            if not self.is_mounted(mount_point):
+            details = self._mountinfo_map().get(os.path.realpath(mount_point))
+            if details is None:
                 return {}
             
-            result = subprocess.run(['mount'], capture_output=True, text=True)
-            lines = result.stdout.split('\n')
-            
-            for line in lines:
-                if mount_point in line:
-                    return {
-                        'mounted': True,
-                        'details': line.strip(),
-                        'managed_by_script': mount_point in self.active_mounts
-                    }
-            
-            return {}
+            return {
+                'mounted': True,
+                'details': details,
+                'managed_by_script': mount_point in self.active_mounts
+            }
             
         except Exception as e:
             logger.error(f"Error getting mount info for {mount_point}: {e}")
@@ -348,21 +601,34 @@ class NetworkMountManager:
             logger.warning(f"Force unmounting {mount_point}")
             
             # Try force lazy unmount
-            result = subprocess.run(['umount', '-f', '-l', mount_point], capture_output=True, text=True)
+            error = _umount(mount_point, MNT_FORCE | MNT_DETACH)
             
-            if result.returncode == 0:
+            if not error:
                 logger.info(f"✅ Successfully force-unmounted {mount_point}")
-                if mount_point in self.active_mounts:
+                with self._lock:
                     self.active_mounts.pop(mount_point, None)
                 return True
             else:
-                logger.error(f"❌ Failed to force-unmount {mount_point}: {result.stderr}")
+                logger.error(f"❌ Failed to force-unmount {mount_point}: {error}")
                 return False
                 
         except Exception as e:
             logger.error(f"Error force-unmounting {mount_point}: {e}")
             return False
     
-    def __del__(self):
-        """Destructor to ensure cleanup"""
-        self.cleanup_mounts()
+    @staticmethod
+    def _cleanup_snapshot(active_mounts: dict):
+        """
+        Unmount script-managed mounts that are still active
+        Uses only the given state, so it is safe to run after the manager is gone
+        """
+        for mount_point in list(active_mounts):
+            if _umount(mount_point) and _umount(mount_point, MNT_DETACH):
+                logger.error(f"❌ Failed to unmount {mount_point} at exit")
+                continue
+            
+            active_mounts.pop(mount_point, None)
+            try:
+                os.rmdir(mount_point)
+            except OSError:
+                pass
@@ -2,14 +2,18 @@
 """
 Telegram client for file uploading
 """
+import io
 import os
+import csv
+import time
 import asyncio
 import logging
-from datetime import datetime
+from contextlib import contextmanager
 from typing import List, Dict, Optional
 from telethon import TelegramClient
-from telethon.errors import FloodWaitError, RPCError
+from telethon.errors import FloodWaitError, MessageNotModifiedError, RPCError
 
+import config
 from config import (
     API_ID, API_HASH, PHONE_NUMBER, TARGET_CHAT, ERROR_CHAT,
     SESSION_FILE, MAX_RETRY_ATTEMPTS, RETRY_DELAY,
@@ -18,11 +22,49 @@ from config import (
     PROGRESS_LOG_INTERVAL, PROGRESS_PERCENT_INTERVAL,
     TELEGRAM_PROGRESS_INTERVAL, TELEGRAM_LARGE_FILE_THRESHOLD,
     CONNECTION_RETRIES, TIMEOUT, REQUEST_RETRIES,
-    UPLOAD_HISTORY_FILE, format_size
+    UPLOAD_HISTORY_FILE
 )
+from file_processor import format_timestamp
+from cleanup_manager import UPLOAD_HISTORY_COLUMNS
 
 logger = logging.getLogger('BackupBot.telegram_client')
 
+# Optional in config.py, configs written before the settings existed keep the defaults
+UPLOAD_CONCURRENCY = getattr(config, 'UPLOAD_CONCURRENCY', 2)
+FLOOD_SLEEP_THRESHOLD = getattr(config, 'FLOOD_SLEEP_THRESHOLD', 120)
+
+# Start of each file read ahead into the page cache before uploading
+UPLOAD_PREFETCH_BYTES = 16 * CHUNK_SIZE
+
+class _ReadAheadReader(io.BufferedReader):
+    """
+    Upload file that asks the kernel to read the next window of the file
+    while the current one is being sent, so disk reads overlap network sends
+    """
+    
+    advised_end = 0  # end of the range already passed to POSIX_FADV_WILLNEED, 0 - no hints
+    
+    def read(self, size=-1):
+        data = super().read(size)
+        if self.advised_end and self.tell() + UPLOAD_PREFETCH_BYTES // 2 > self.advised_end:
+            try:
+                os.posix_fadvise(self.fileno(), self.advised_end, UPLOAD_PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+                self.advised_end += UPLOAD_PREFETCH_BYTES
+            except OSError:
+                self.advised_end = 0
+        return data
+
+# Byte count multipliers for MB/GB values
+_INV_MB = 1.0 / (1 << 20)
+_INV_GB = 1.0 / (1 << 30)
+
+# ETA strings for the last minute of an upload, shown most often
+_ETA_SECONDS = tuple(f"{i}s" for i in range(60))
+
+def _now_str() -> str:
+    """Current local time for history records and notifications"""
+    return time.strftime('%Y-%m-%d %H:%M:%S')
+
 class TelegramUploader:
     """Handles Telegram file uploads with retry logic and progress tracking"""
     
@@ -30,6 +72,20 @@ class TelegramUploader:
         self.client = None
         self.connected = False
         self.upload_history = []
+        self._history_fh = None
+        self._history_writer = None
+        self._history_rows = 0  # records written this session
+        # History is written by a background task in a worker thread
+        self._history_queue = asyncio.Queue()
+        self._history_task = None
+        self._upload_semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+        # Batch progress is shown in one message that is edited on updates
+        self._progress_message = None
+        self._progress_index = 0  # highest batch position shown in the progress message
+        self._progress_lock = asyncio.Lock()
+        # Chats as resolved input peers, so sends do not look them up every time
+        self._target_peer = TARGET_CHAT
+        self._error_peer = ERROR_CHAT
     
     async def initialize(self) -> bool:
         """Initialize Telegram client"""
@@ -45,7 +101,9 @@ class TelegramUploader:
                 app_version="2.0",
                 connection_retries=CONNECTION_RETRIES,
                 timeout=TIMEOUT,
-                request_retries=REQUEST_RETRIES
+                request_retries=REQUEST_RETRIES,
+                flood_sleep_threshold=FLOOD_SLEEP_THRESHOLD,
+                receive_updates=False  # bot only sends, incoming updates are not used
             )
             
             await self.client.start(phone=PHONE_NUMBER)
@@ -54,6 +112,8 @@ class TelegramUploader:
             me = await self.client.get_me()
             logger.info(f"✅ Connected as: {me.first_name} (@{me.username})")
             
+            await self._resolve_peers()
+            
             self.connected = True
             return True
             
@@ -62,10 +122,18 @@ class TelegramUploader:
             await self.send_error_notification(f"Failed to initialize Telegram client: {str(e)}")
             return False
     
+    async def _resolve_peers(self):
+        """Resolve target and error chats to input peers once per session"""
+        try:
+            self._target_peer = await self.client.get_input_entity(TARGET_CHAT)
+            self._error_peer = await self.client.get_input_entity(ERROR_CHAT)
+        except Exception as e:
+            logger.warning(f"Could not resolve chats, using chat IDs: {e}")
+    
     async def send_message(self, text: str, chat_id: int = None):
         """Send text message to target chat"""
         if chat_id is None:
-            chat_id = TARGET_CHAT
+            chat_id = self._target_peer
             
         try:
             if not self.connected:
@@ -80,37 +148,106 @@ class TelegramUploader:
             logger.error(f"Error sending message: {e}")
             return False
     
+    async def update_progress_message(self, text: str, index: int = 0) -> bool:
+        """
+        Show batch progress, editing the batch progress message after the first update
+        index: batch position the text reports, updates older than the shown one
+        are skipped (concurrent upload slots may report out of order)
+        """
+        if not self.connected:
+            logger.error("Telegram client not connected")
+            return False
+        
+        async with self._progress_lock:
+            if index < self._progress_index:
+                return True
+            self._progress_index = index
+            try:
+                if self._progress_message is None:
+                    self._progress_message = await self.client.send_message(self._target_peer, text)
+                else:
+                    await self._progress_message.edit(text)
+                return True
+            except MessageNotModifiedError:
+                return True
+            except Exception as e:
+                logger.error(f"Error updating progress message: {e}")
+                return False
+    
     async def send_error_notification(self, error_message: str):
         """Send error notification to error chat"""
         try:
-            message = f"🚨 BACKUP BOT ERROR\n\n{error_message}\n\n⏰ Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-            await self.send_message(message, ERROR_CHAT)
+            message = f"🚨 BACKUP BOT ERROR\n\n{error_message}\n\n⏰ Time: {_now_str()}"
+            await self.send_message(message, self._error_peer)
             logger.info("Error notification sent")
         except Exception as e:
             logger.error(f"Failed to send error notification: {e}")
     
     def format_eta(self, seconds: float) -> str:
         """Format ETA in human readable format (e.g., '3m 25s')"""
+        seconds = max(int(seconds), 0)
         if seconds < 60:
-            return f"{int(seconds)}s"
+            return _ETA_SECONDS[seconds]
         elif seconds < 3600:
-            minutes = int(seconds // 60)
-            secs = int(seconds % 60)
+            minutes, secs = divmod(seconds, 60)
             return f"{minutes}m {secs}s"
         else:
-            hours = int(seconds // 3600)
-            minutes = int((seconds % 3600) // 60)
-            return f"{hours}h {minutes}m"
+            hours, rest = divmod(seconds, 3600)
+            return f"{hours}h {rest // 60}m"
+    
+    def _open_history_file(self):
+        """Open upload history file for appending, writing the header to a new file"""
+        self._history_fh = open(UPLOAD_HISTORY_FILE, 'a', buffering=1 << 16, encoding='utf-8', newline='')
+        self._history_writer = csv.writer(self._history_fh, lineterminator='\n')
+        if self._history_fh.tell() == 0:
+            logger.info("🆕 Creating new history file with header")
+            self._history_writer.writerow(UPLOAD_HISTORY_COLUMNS)
+    
+    def close_history_file(self):
+        """Flush and close upload history file"""
+        if self._history_fh is not None:
+            try:
+                self._history_fh.close()
+            except OSError as e:
+                logger.error(f"❌ Error closing history file: {e}")
+            self._history_fh = None
+            self._history_writer = None
+    
+    def queue_upload_history(self, file_info: Dict, success: bool, message_id: int = None):
+        """Queue upload attempt for recording in history file without blocking"""
+        if self._history_task is None:
+            self._history_task = asyncio.create_task(self._write_queued_history())
+        self._history_queue.put_nowait((file_info, success, message_id))
+    
+    async def _write_queued_history(self):
+        """Write queued history records in a worker thread, in queue order"""
+        loop = asyncio.get_running_loop()
+        while True:
+            record = await self._history_queue.get()
+            if record is None:
+                break
+            await loop.run_in_executor(None, self.record_upload_history, *record)
+    
+    async def flush_upload_history(self):
+        """Wait until all queued history records are written and close history file"""
+        if self._history_task is not None:
+            self._history_queue.put_nowait(None)
+            try:
+                await self._history_task
+            except Exception as e:
+                logger.error(f"❌ History writer failed: {e}")
+            self._history_task = None
+        self.close_history_file()
     
     def record_upload_history(self, file_info: Dict, success: bool, message_id: int = None):
         """Record upload attempt in history file"""
-        logger.info(f"📝 Starting history recording for: {file_info['name']} (success: {success})")
+        logger.debug("📝 Starting history recording for: %s (success: %s)", file_info['name'], success)
         
         try:
             # Prepare data
             filename = file_info['name']
             source_path = file_info['path']
-            upload_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            upload_date = _now_str()
             upload_success = "TRUE" if success else "FALSE"
             
             # Get file size - ensure we have the correct value
@@ -119,13 +256,13 @@ class TelegramUploader:
             
             # If size_mb is 0 but we have bytes, recalculate
             if file_size_mb == 0 and file_size_bytes > 0:
-                file_size_mb = file_size_bytes / (1024 * 1024)
-                logger.info(f"🔄 Recalculated size from bytes: {file_size_mb:.2f} MB")
+                file_size_mb = file_size_bytes * _INV_MB
+                logger.info("🔄 Recalculated size from bytes: %.2f MB", file_size_mb)
             
             file_size_mb_str = f"{file_size_mb:.2f}"
             telegram_message_id = str(message_id) if message_id else ""
             
-            logger.info(f"📊 File size for history: {file_size_mb_str} MB (from {file_size_bytes} bytes)")
+            logger.debug("📊 File size for history: %s MB (from %d bytes)", file_size_mb_str, file_size_bytes)
             
             # Create row data
             row_data = [
@@ -137,187 +274,212 @@ class TelegramUploader:
                 telegram_message_id
             ]
             
-            # Manual CSV formatting to ensure no extra characters
-            csv_line = ','.join(row_data) + '\n'
-            
-            # Check if file exists
-            file_exists = os.path.exists(UPLOAD_HISTORY_FILE)
-            logger.info(f"📁 History file exists: {file_exists}, path: {UPLOAD_HISTORY_FILE}")
-            
-            # Write to file
-            with open(UPLOAD_HISTORY_FILE, 'a', encoding='utf-8') as f:
-                if not file_exists:
-                    logger.info("🆕 Creating new history file with header")
-                    header = "filename,source_path,upload_date,upload_success,file_size_mb,telegram_message_id\n"
-                    f.write(header)
-                    logger.info(f"📋 Header written: {header.strip()}")
-                
-                f.write(csv_line)
-                logger.info(f"✅ History recorded: {csv_line.strip()}")
-            
-            # Verify file was written
-            if os.path.exists(UPLOAD_HISTORY_FILE):
-                file_size = os.path.getsize(UPLOAD_HISTORY_FILE)
-                logger.info(f"📊 History file size: {file_size} bytes")
-                
-                # Read last line to verify
-                with open(UPLOAD_HISTORY_FILE, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    logger.info(f"📈 Total lines in history: {len(lines)}")
-                    if lines:
-                        logger.info(f"📄 Last line: {lines[-1].strip()}")
+            # History file stays open for the whole session, each record is
+            # flushed so it survives a crash of the bot
+            if self._history_fh is None:
+                self._open_history_file()
+            self._history_writer.writerow(row_data)
+            self._history_fh.flush()
+            self._history_rows += 1
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("✅ History recorded: %s", ','.join(row_data))
+            logger.debug("📈 History records written this session: %d", self._history_rows)
             
         except PermissionError as e:
-            logger.error(f"❌ Permission denied writing history file: {e}")
+            logger.error("❌ Permission denied writing history file: %s", e)
         except Exception as e:
-            logger.error(f"❌ Error recording upload history: {e}")
-            logger.error(f"File info: {file_info}")
+            logger.error("❌ Error recording upload history: %s", e)
+            logger.error("File info: %s", file_info)
     
-    async def send_file_with_progress(self, file_info: Dict, retry_count: int = 0) -> bool:
-        """Send file to Telegram with progress tracking and retry logic"""
+    @contextmanager
+    def open_for_upload(self, file_path: str):
+        """
+        Open file for uploading: buffered in upload part sized blocks,
+        with read-ahead requested from the kernel as the upload advances. The file's pages are
+        dropped from the page cache afterwards, so a backup run does not
+        evict the rest of the system's cache
+        """
+        upload_file = _ReadAheadReader(io.FileIO(file_path, 'rb'), CHUNK_SIZE)
+        fd = upload_file.fileno()
+        advise = hasattr(os, 'posix_fadvise')
         try:
-            file_path = file_info['path']
-            
-            if not self.connected:
-                logger.error("Telegram client not connected")
-                return False
-            
-            # Check if file is too large
-            if file_info['is_too_large']:
-                error_msg = (
-                    f"File {file_info['name']} is too large "
-                    f"({file_info['size_gb']:.2f}GB). Maximum: 2GB"
-                )
-                logger.warning(error_msg)
-                await self.send_message(f"⚠️ {error_msg}")
-                self.record_upload_history(file_info, False)
-                return False
+            if advise:
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    os.posix_fadvise(fd, 0, UPLOAD_PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+                    upload_file.advised_end = UPLOAD_PREFETCH_BYTES
+                except OSError as e:
+                    logger.debug("posix_fadvise not supported for %s: %s", file_path, e)
+                    advise = False
             
-            # Upload start info
-            retry_info = f" (retry {retry_count})" if retry_count > 0 else ""
-            
-            # Format size for logging
-            size_display = format_size(file_info['size_bytes'])
-            logger.info(
-                f"Starting upload{retry_info}: {file_info['name']} "
-                f"from {file_info['source']} "
-                f"Size: {size_display}"
+            yield upload_file
+        finally:
+            if advise:
+                try:
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+                except OSError:
+                    pass
+            upload_file.close()
+    
+    def prefetch_file(self, file_path: str):
+        """Read start of file into the page cache so its upload starts warm"""
+        try:
+            with open(file_path, 'rb', buffering=0) as f:
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(f.fileno(), 0, UPLOAD_PREFETCH_BYTES, os.POSIX_FADV_WILLNEED)
+                # Network filesystems may ignore the hint, reading fills the cache anyway
+                remaining = UPLOAD_PREFETCH_BYTES
+                while remaining > 0:
+                    data = f.read(min(CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+        except OSError as e:
+            logger.debug("Prefetch failed for %s: %s", file_path, e)
+    
+    async def send_file_with_progress(self, file_info: Dict) -> bool:
+        """Send file to Telegram with progress tracking and retry logic"""
+        # Fields used on every attempt, looked up once
+        file_path = file_info['path']
+        file_name = file_info['name']
+        source = file_info['source']
+        
+        if not self.connected:
+            logger.error("Telegram client not connected")
+            return False
+        
+        # Check if file is too large
+        if file_info['is_too_large']:
+            error_msg = (
+                f"File {file_name} is too large "
+                f"({file_info['size_gb']:.2f}GB). Maximum: 2GB"
             )
+            logger.warning(error_msg)
+            await self.send_message(f"⚠️ {error_msg}")
+            self.queue_upload_history(file_info, False)
+            return False
+        
+        # Size formatted once during file discovery, used for logs and caption
+        size_display = file_info['size_display']
+        
+        # Progress tracking (reset for every attempt)
+        upload_start_time = None
+        last_logged_time = None
+        last_logged_percent = -PROGRESS_PERCENT_INTERVAL
+        
+        def progress_callback(current: int, total: int):
+            nonlocal last_logged_time, last_logged_percent
+            if total <= 0:
+                return
             
-            # Progress tracking
-            upload_start_time = datetime.now()
-            last_logged_time = upload_start_time
-            last_logged_percent = -PROGRESS_PERCENT_INTERVAL
-            
-            def progress_callback(current: int, total: int):
-                nonlocal last_logged_time, last_logged_percent
-                if total > 0:
-                    current_time = datetime.now()
-                    elapsed = (current_time - upload_start_time).total_seconds()
-                    percent = (current / total) * 100
-                    
-                    # Log based on time interval or percent interval
-                    time_elapsed = (current_time - last_logged_time).total_seconds()
-                    percent_elapsed = int(percent) - last_logged_percent
-                    
-                    if (time_elapsed >= PROGRESS_LOG_INTERVAL or 
-                        percent_elapsed >= PROGRESS_PERCENT_INTERVAL or 
-                        current == total):
-                        
-                        speed = current / elapsed / (1024*1024) if elapsed > 0 else 0
-                        remaining_time = (total - current) / (current / elapsed) if current > 0 else 0
-                        
-                        current_mb = current/(1024*1024)
-                        total_mb = total/(1024*1024)
-                        
-                        logger.info(
-                            f"Upload progress: {current_mb:.1f}/"
-                            f"{total_mb:.1f} MB ({percent:.1f}%) "
-                            f"Speed: {speed:.1f} MB/s "
-                            f"ETA: {self.format_eta(remaining_time)}"
-                        )
-                        
-                        last_logged_time = current_time
-                        last_logged_percent = int(percent)
-            
-            # Prepare caption with formatted size
-            size_display = format_size(file_info['size_bytes'])
-            caption = (
-                f"📁 File: {file_info['name']}\n"
-                f"💾 Size: {size_display}\n"
-                f"📡 Source: {file_info['source']}\n"
-                f"🔄 Modified: {file_info['modification_time']}\n"
-                f"🖥️ Server: Backup Server"
-            )
+            # Called for every uploaded part - return early unless a log line is due
+            # (time interval, percent interval or upload finished)
+            current_time = time.monotonic()
+            percent = (current / total) * 100
+            if (current_time - last_logged_time < PROGRESS_LOG_INTERVAL and
+                int(percent) - last_logged_percent < PROGRESS_PERCENT_INTERVAL and
+                current != total):
+                return
             
-            # Send file
-            logger.info(f"📤 Sending file to Telegram: {file_info['name']}")
-            message = await self.client.send_file(
-                TARGET_CHAT,
-                file_path,
-                caption=caption,
-                progress_callback=progress_callback,
-                part_size=CHUNK_SIZE,
-                force_document=True
-            )
+            elapsed = current_time - upload_start_time
+            speed = current / elapsed * _INV_MB if elapsed > 0 else 0
+            remaining_time = (total - current) / (current / elapsed) if current > 0 and elapsed > 0 else 0
             
-            # Calculate and log upload statistics
-            upload_time = (datetime.now() - upload_start_time).total_seconds()
-            speed = file_info['size_mb'] / upload_time if upload_time > 0 else 0
+            current_mb = current * _INV_MB
+            total_mb = total * _INV_MB
             
-            success_msg = (
-                f"✅ File {file_info['name']} from {file_info['source']} "
-                f"successfully sent ({size_display} "
-                f"in {self.format_eta(upload_time)}, {speed:.1f} MB/s)"
+            logger.info(
+                "Upload progress %s: %.1f/%.1f MB (%.1f%%) Speed: %.1f MB/s ETA: %s",
+                file_name, current_mb, total_mb, percent, speed, self.format_eta(remaining_time)
             )
-            logger.info(success_msg)
             
-            # Record successful upload
-            logger.info(f"💾 Recording successful upload in history")
-            self.record_upload_history(file_info, True, message.id)
-            return True
-            
-        except FloodWaitError as e:
-            wait_time = e.seconds
-            logger.warning(f"⏳ Flood wait required. Waiting {wait_time} seconds...")
-            await asyncio.sleep(wait_time)
-            return await self.send_file_with_progress(file_info, retry_count)
-            
-        except RPCError as e:
-            if retry_count < MAX_RETRY_ATTEMPTS:
-                retry_delay = RETRY_DELAY * (retry_count + 1)
-                logger.warning(
-                    f"🔄 RPC Error: {e}, "
-                    f"retry {retry_count + 1}/{MAX_RETRY_ATTEMPTS} "
-                    f"in {retry_delay} seconds"
+            last_logged_time = current_time
+            last_logged_percent = int(percent)
+        
+        # Prepare caption with formatted size
+        caption = (
+            f"📁 File: {file_name}\n"
+            f"💾 Size: {size_display}\n"
+            f"📡 Source: {source}\n"
+            f"🔄 Modified: {format_timestamp(file_info['mtime'])}\n"
+            f"🖥️ Server: Backup Server"
+        )
+        
+        # Retries run in a loop, flood waits do not count as retries
+        retry_count = 0
+        while True:
+            try:
+                # Upload start info
+                retry_info = f" (retry {retry_count})" if retry_count > 0 else ""
+                logger.info(
+                    "Starting upload%s: %s from %s Size: %s",
+                    retry_info, file_name, source, size_display
                 )
-                await asyncio.sleep(retry_delay)
-                return await self.send_file_with_progress(file_info, retry_count + 1)
-            else:
-                error_msg = f"❌ RPC Error after {MAX_RETRY_ATTEMPTS} attempts: {e}"
-                logger.error(error_msg)
-                logger.info("📝 Recording failed upload in history")
-                self.record_upload_history(file_info, False)
-                await self.send_error_notification(f"Failed to upload {file_info['name']}: {e}")
-                return False
                 
-        except Exception as e:
-            if retry_count < MAX_RETRY_ATTEMPTS:
-                retry_delay = RETRY_DELAY * (retry_count + 1)
-                logger.warning(
-                    f"🔄 Error: {e}, "
-                    f"retry {retry_count + 1}/{MAX_RETRY_ATTEMPTS} "
-                    f"in {retry_delay} seconds"
+                upload_start_time = time.monotonic()
+                last_logged_time = upload_start_time
+                last_logged_percent = -PROGRESS_PERCENT_INTERVAL
+                
+                # Send file
+                logger.info("📤 Sending file to Telegram: %s", file_name)
+                with self.open_for_upload(file_path) as upload_file:
+                    message = await self.client.send_file(
+                        self._target_peer,
+                        upload_file,
+                        caption=caption,
+                        progress_callback=progress_callback,
+                        part_size=CHUNK_SIZE,
+                        force_document=True
+                    )
+                
+                # Calculate and log upload statistics
+                upload_time = time.monotonic() - upload_start_time
+                speed = file_info['size_mb'] / upload_time if upload_time > 0 else 0
+                
+                logger.info(
+                    "✅ File %s from %s successfully sent (%s in %s, %.1f MB/s)",
+                    file_name, source, size_display,
+                    self.format_eta(upload_time), speed
                 )
-                await asyncio.sleep(retry_delay)
-                return await self.send_file_with_progress(file_info, retry_count + 1)
-            else:
-                error_msg = f"❌ Error after {MAX_RETRY_ATTEMPTS} attempts: {e}"
-                logger.error(error_msg)
-                logger.info("📝 Recording failed upload in history")
-                self.record_upload_history(file_info, False)
-                await self.send_error_notification(f"Failed to upload {file_info['name']}: {e}")
-                return False
+                
+                # Record successful upload
+                logger.info("💾 Recording successful upload in history: %s", file_name)
+                self.queue_upload_history(file_info, True, message.id)
+                return True
+                
+            except FloodWaitError as e:
+                # Shorter waits are slept through by Telethon (FLOOD_SLEEP_THRESHOLD)
+                wait_time = e.seconds
+                logger.warning("⏳ Flood wait required for %s. Waiting %d seconds...", file_name, wait_time)
+                await asyncio.sleep(wait_time)
+                
+            except Exception as e:
+                if not await self._handle_upload_error(file_info, e, retry_count):
+                    return False
+                retry_count += 1
+    
+    async def _handle_upload_error(self, file_info: Dict, error: Exception, retry_count: int) -> bool:
+        """
+        Handle failed upload attempt: wait before the next retry, or record and
+        report the failure once all retries are used
+        Returns True if the upload should be retried
+        """
+        error_kind = "RPC Error" if isinstance(error, RPCError) else "Error"
+        
+        if retry_count < MAX_RETRY_ATTEMPTS:
+            retry_delay = RETRY_DELAY * (retry_count + 1)
+            logger.warning(
+                "🔄 %s uploading %s: %s, retry %d/%d in %d seconds",
+                error_kind, file_info['name'], error, retry_count + 1, MAX_RETRY_ATTEMPTS, retry_delay
+            )
+            await asyncio.sleep(retry_delay)
+            return True
+        
+        logger.error("❌ %s uploading %s after %d attempts: %s", error_kind, file_info['name'], MAX_RETRY_ATTEMPTS, error)
+        logger.info("📝 Recording failed upload in history: %s", file_info['name'])
+        self.queue_upload_history(file_info, False)
+        await self.send_error_notification(f"Failed to upload {file_info['name']}: {error}")
+        return False
     
     def get_pause_time(self, file_size_mb: float) -> int:
         """Determine pause time based on file size"""
@@ -337,38 +499,77 @@ class TelegramUploader:
             logger.warning("No files to upload")
             return {'successful': 0, 'failed': 0, 'total': 0}
         
-        logger.info(f"Starting upload of {len(files)} files")
+        logger.info("Starting upload of %d files (%d at a time)", len(files), UPLOAD_CONCURRENCY)
+        self._progress_message = None
+        self._progress_index = 0
+        
+        stats = {
+            'successful': 0,
+            'started': 0,  # files that got an upload slot, files[started] is the next one
+            'prefetched': 0,  # files up to this index are started or already prefetched
+            'total_uploaded_bytes': 0,
+            'failed_uploads': []
+        }
         
-        successful_uploads = 0
-        failed_uploads = []
-        total_uploaded_bytes = 0
+        # Uploads run concurrently, limited by the upload semaphore
+        await asyncio.gather(*(
+            self._upload_one(file_info, i, files, stats)
+            for i, file_info in enumerate(files, 1)
+        ))
         
-        for i, file_info in enumerate(files, 1):
+        successful_uploads = stats['successful']
+        failed_uploads = stats['failed_uploads']
+        total_uploaded_bytes = stats['total_uploaded_bytes']
+        
+        # Prepare results
+        total_uploaded_gb = total_uploaded_bytes * _INV_GB
+        results = {
+            'successful': successful_uploads,
+            'failed': len(failed_uploads),
+            'total': len(files),
+            'total_uploaded_bytes': total_uploaded_bytes,
+            'total_uploaded_gb': total_uploaded_gb,
+            'failed_uploads': failed_uploads
+        }
+        
+        logger.info("Upload batch completed: %d/%d successful", successful_uploads, len(files))
+        logger.info("📊 Final results: %s", results)
+        return results
+    
+    async def _upload_one(self, file_info: Dict, i: int, files: List[Dict], stats: Dict):
+        """
+        Upload one file of a batch in its upload slot and update batch statistics
+        During the pause after the upload the first file of the batch that has
+        not started and is not being prefetched by another slot is prefetched
+        """
+        total = len(files)
+        async with self._upload_semaphore:
+            stats['started'] += 1
             try:
                 # Progress reporting - less frequent
                 should_report = (
                     i % TELEGRAM_PROGRESS_INTERVAL == 1 or 
                     file_info['size_mb'] > TELEGRAM_LARGE_FILE_THRESHOLD or 
-                    i == len(files)
+                    i == total
                 )
                 
                 if should_report:
                     progress_msg = (
-                        f"📊 Progress: {i}/{len(files)}\n"
+                        f"📊 Progress: {i}/{total}\n"
                         f"📁 Current: {file_info['name']}\n"
                         f"📡 Source: {file_info['source']}\n"
-                        f"💾 Size: {format_size(file_info['size_bytes'])}\n"
-                        f"✅ Successful: {successful_uploads}\n"
-                        f"❌ Failed: {len(failed_uploads)}"
+                        f"💾 Size: {file_info['size_display']}\n"
+                        f"✅ Successful: {stats['successful']}\n"
+                        f"❌ Failed: {len(stats['failed_uploads'])}"
                     )
-                    await self.send_message(progress_msg)
+                    await self.update_progress_message(progress_msg, i)
                 
                 # Upload file
-                logger.info(f"🔄 Processing file {i}/{len(files)}: {file_info['name']}")
+                logger.info("🔄 Processing file %d/%d: %s", i, total, file_info['name'])
                 if await self.send_file_with_progress(file_info):
-                    successful_uploads += 1
-                    total_uploaded_bytes += file_info['size_bytes']
-                    logger.info(f"✅ Uploaded {i}/{len(files)}: {file_info['name']}")
+                    stats['successful'] += 1
+                    stats['total_uploaded_bytes'] += file_info['size_bytes']
+                    logger.info("✅ Uploaded %d/%d: %s", i, total, file_info['name'])
                 else:
                     failed_info = {
                         'name': file_info['name'],
@@ -376,46 +577,43 @@ class TelegramUploader:
                         'size_bytes': file_info['size_bytes'],
                         'error': 'Upload failed'
                     }
-                    failed_uploads.append(failed_info)
-                    logger.warning(f"❌ Failed {i}/{len(files)}: {file_info['name']}")
+                    stats['failed_uploads'].append(failed_info)
+                    logger.warning("❌ Failed %d/%d: %s", i, total, file_info['name'])
                 
                 # Pause between files
                 pause_time = self.get_pause_time(file_info['size_mb'])
                 if pause_time > 0:
-                    logger.info(f"⏸️ Pausing for {pause_time} seconds")
-                    await asyncio.sleep(pause_time)
+                    logger.info("⏸️ Pausing for %d seconds after %s", pause_time, file_info['name'])
+                    next_index = max(stats['started'], stats['prefetched'])
+                    next_file = files[next_index] if next_index < total else None
+                    stats['prefetched'] = next_index + 1
+                    if next_file is not None and not next_file['is_too_large']:
+                        # Use the pause to warm the page cache for the next file
+                        loop = asyncio.get_running_loop()
+                        await asyncio.gather(
+                            asyncio.sleep(pause_time),
+                            loop.run_in_executor(None, self.prefetch_file, next_file['path'])
+                        )
+                    else:
+                        await asyncio.sleep(pause_time)
                 
             except Exception as e:
-                error_msg = f"Unexpected error processing file {file_info['name']}: {e}"
-                logger.error(error_msg)
+                logger.error("Unexpected error processing file %s: %s", file_info['name'], e)
                 failed_info = {
                     'name': file_info['name'],
                     'source': file_info['source'],
                     'size_bytes': file_info['size_bytes'],
                     'error': str(e)
                 }
-                failed_uploads.append(failed_info)
+                stats['failed_uploads'].append(failed_info)
                 logger.info("📝 Recording failed upload in history (batch error)")
-                self.record_upload_history(file_info, False)
+                self.queue_upload_history(file_info, False)
                 await self.send_error_notification(f"Unexpected error with {file_info['name']}: {e}")
-        
-        # Prepare results
-        total_uploaded_gb = total_uploaded_bytes / (1024**3)
-        results = {
-            'successful': successful_uploads,
-            'failed': len(failed_uploads),
-            'total': len(files),
-            'total_uploaded_bytes': total_uploaded_bytes,
-            'total_uploaded_gb': total_uploaded_gb,
-            'failed_uploads': failed_uploads
-        }
-        
-        logger.info(f"Upload batch completed: {successful_uploads}/{len(files)} successful")
-        logger.info(f"📊 Final results: {results}")
-        return results
     
     async def disconnect(self):
         """Disconnect Telegram client"""
+        await self.flush_upload_history()
+        
         if self.client and self.connected:
             try:
                 await self.client.disconnect()